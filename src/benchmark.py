@@ -0,0 +1,599 @@
+import contextlib
+import gc
+import io
+import re
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from htmlnode import LeafNode, ParentNode
+
+CONTENT_DIR = Path(__file__).resolve().parent.parent / "content"
+
+
+def timed(func, repeat=5):
+    # Like timeit, keep the collector out of the measurement
+    best = None
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None or elapsed < best else best
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def report(name, seconds, baseline=None):
+    line = f"{name:<40} {seconds * 1000:10.3f} ms"
+    if baseline:
+        line += f"  ({baseline / seconds:5.2f}x)"
+    print(line)
+
+
+def memory(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def corpus_pages():
+    from markdown_parser import split_front_matter
+    return [split_front_matter(path.read_text())[1]
+            for path in sorted(CONTENT_DIR.rglob("*.md"))]
+
+
+def large_page(copies=50):
+    return "\n\n".join(corpus_pages() * copies)
+
+
+def corpus_throughput(rounds=20, repeat=5):
+    # Bytes of markdown turned into node trees per second
+    from render import markdown_to_html_node
+    pages = corpus_pages()
+    size = sum(len(page.encode("utf-8")) for page in pages) * rounds
+
+    def render_corpus():
+        for _ in range(rounds):
+            for page in pages:
+                markdown_to_html_node(page)
+
+    return size / timed(render_corpus, repeat)
+
+
+REFERENCE_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def reference_workload(pages, rounds):
+    # Plain Python over the same text (splitting, a regex scan, small
+    # tuples and string joins), standing in for the machine's speed
+    for _ in range(rounds):
+        for page in pages:
+            for block in page.split("\n\n"):
+                tokens = [(token, len(token)) for token in REFERENCE_TOKEN_PATTERN.findall(block)]
+                " ".join(token for token, _ in tokens).replace("&", "&amp;")
+
+
+def relative_throughput(rounds=20, repeat=5):
+    # Corpus rendering speed as a multiple of the reference workload's,
+    # timed alternately in one run so both see the same machine and load
+    from render import markdown_to_html_node
+    pages = corpus_pages()
+    render_best = reference_best = None
+    for _ in range(repeat):
+        render = timed(lambda: [markdown_to_html_node(page)
+                                for _ in range(rounds) for page in pages], 1)
+        reference = timed(lambda: reference_workload(pages, rounds), 1)
+        render_best = render if render_best is None else min(render, render_best)
+        reference_best = reference if reference_best is None else min(reference, reference_best)
+    return reference_best / render_best
+
+
+def bench_throughput():
+    print(f"{'markdown_to_html_node corpus':<40} {corpus_throughput() / 1024:10.0f} KiB/s")
+    print(f"{'relative to the reference workload':<40} {relative_throughput():10.3f}x")
+
+
+def recursive_to_html(node):
+    # The serializer as it was before ParentNode.to_html became iterative
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    result = ""
+    for child in node.children:
+        result += recursive_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{result}</{node.tag}>"
+
+
+def wide_tree(width):
+    return ParentNode("div", [
+        ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")])
+        for _ in range(width)
+    ])
+
+
+def deep_tree(depth):
+    node = LeafNode("i", "leaf")
+    for i in range(depth):
+        node = ParentNode("li" if i % 2 else "ul", [node])
+    return ParentNode("div", [node])
+
+
+def bench_to_html():
+    for name, tree in (("wide 20000", wide_tree(20000)),
+                       ("deep 500", deep_tree(500))):
+        assert tree.to_html() == recursive_to_html(tree)
+        recursive = timed(lambda: recursive_to_html(tree))
+        report(f"to_html recursive {name}", recursive)
+        report(f"to_html iterative {name}", timed(tree.to_html), recursive)
+    deep = deep_tree(100000)
+    try:
+        recursive_to_html(deep)
+        print("to_html recursive deep 100000         ok")
+    except RecursionError:
+        print("to_html recursive deep 100000         RecursionError")
+    report("to_html iterative deep 100000", timed(deep.to_html, 1))
+
+
+def bench_flatdoc():
+    from render import markdown_to_flat_document, markdown_to_html_node
+    page = large_page()
+    assert (markdown_to_flat_document(page).to_html()
+            == markdown_to_html_node(page).to_html())
+    tree = timed(lambda: markdown_to_html_node(page).to_html())
+    report(f"page {len(page) // 1024} KiB node tree", tree)
+    report(f"page {len(page) // 1024} KiB flat document",
+           timed(lambda: markdown_to_flat_document(page).to_html()), tree)
+    for name, build in (("node tree", markdown_to_html_node),
+                        ("flat document", markdown_to_flat_document)):
+        retained, peak = memory(lambda: build(page))
+        print(f"{name + ' memory':<40} {retained / 1024:8.0f} KiB retained"
+              f" {peak / 1024:8.0f} KiB peak")
+
+
+ESCAPE_OVERHEAD_BUDGET = 0.10
+
+
+def bench_escape():
+    import html
+    import htmlnode
+    import render
+    page = large_page()
+    tree = render.markdown_to_html_node(page)
+    fast = (htmlnode.escape_text, htmlnode.escape_attr, render.needs_escape)
+    variants = (
+        ("none", lambda text: text, lambda value: value, lambda text: False),
+        ("html.escape", lambda text: html.escape(text, False), html.escape,
+         lambda text: True),
+        ("fast path", *fast),
+    )
+    results = {}
+    try:
+        for name, text_escape, attr_escape, check in variants:
+            htmlnode.escape_text, htmlnode.escape_attr = text_escape, attr_escape
+            render.needs_escape = check
+            results[name] = (
+                timed(lambda: render.markdown_to_html_node(page).to_html()),
+                timed(tree.to_html),
+            )
+    finally:
+        htmlnode.escape_text, htmlnode.escape_attr, render.needs_escape = fast
+    none_pipeline, none_render = results["none"]
+    for name, (pipeline, render) in results.items():
+        report(f"render escaping {name}", pipeline, none_pipeline)
+    for name, (pipeline, render) in results.items():
+        report(f"to_html only escaping {name}", render, none_render)
+    overhead = results["fast path"][0] / none_pipeline - 1
+    verdict = "ok" if overhead <= ESCAPE_OVERHEAD_BUDGET else "OVER BUDGET"
+    print(f"escaping overhead {overhead:.1%} (budget {ESCAPE_OVERHEAD_BUDGET:.0%}) {verdict}")
+
+
+def bench_tags():
+    from htmlnode import CLOSE_TAGS, OPEN_TAGS, FrozenProps, serialize_props
+    from render import markdown_to_html_node
+    tags = ["p", "li", "code", "a", "b"] * 20000
+
+    def formatted():
+        return "".join(f"<{tag}>x</{tag}>" for tag in tags)
+
+    def tabled():
+        return "".join(f"{OPEN_TAGS[tag]}x{CLOSE_TAGS[tag]}" for tag in tags)
+
+    assert formatted() == tabled()
+    baseline = timed(formatted)
+    report("tags f-string", baseline)
+    report("tags table", timed(tabled), baseline)
+    props = {"src": "/images/tolkien.png", "alt": "JRR Tolkien sitting"}
+    frozen = FrozenProps(props)
+    assert serialize_props(props) == serialize_props(frozen)
+    plain = timed(lambda: [serialize_props(props) for _ in range(100000)])
+    report("props dict x100000", plain)
+    report("props frozen x100000",
+           timed(lambda: [serialize_props(frozen) for _ in range(100000)]), plain)
+    tree = markdown_to_html_node(large_page())
+    report("page to_html", timed(tree.to_html))
+
+
+def nested_list(items, depth, ordered=False):
+    # items list items spread over depth levels of nesting, every item
+    # opening a sublist until the deepest level is reached
+    lines = []
+    for i in range(items):
+        level = i % depth
+        marker = f"{i + 1}." if ordered else "-"
+        lines.append(f"{'  ' * level}{marker} item **{i}** with `code`")
+    return "\n".join(lines)
+
+
+def bench_lists():
+    from render import markdown_to_html_node
+    for items in (1000, 10000):
+        flat = timed(lambda: markdown_to_html_node(nested_list(items, 1)), 3)
+        report(f"list {items} flat", flat)
+        for depth in (4, 50):
+            for ordered in (False, True):
+                page = nested_list(items, depth, ordered)
+                name = f"list {items} depth {depth}{' ordered' if ordered else ''}"
+                report(name, timed(lambda: markdown_to_html_node(page), 3), flat)
+    page = nested_list(10000, 1000)
+    report("list 10000 depth 1000 to_html",
+           timed(markdown_to_html_node(page).to_html, 3))
+
+
+def bench_toc():
+    from markdown_parser import split_front_matter
+    from render import Outline, markdown_to_html_node
+    page = split_front_matter((CONTENT_DIR / "blog" / "majesty" / "index.md").read_text())[1]
+    page = "\n\n".join([page] * 20)
+    plain = timed(lambda: markdown_to_html_node(page).to_html())
+    report("majesty x20 without outline", plain)
+
+    def with_outline():
+        outline = Outline()
+        markdown_to_html_node(page, outline=outline).to_html()
+        return outline.to_html()
+
+    report("majesty x20 with outline and toc", timed(with_outline), plain)
+
+
+def bench_highlight():
+    import highlight
+    from render import markdown_to_html_node
+    snippet = Path(highlight.__file__).read_text()
+    page = "\n\n".join(f"Section {i}\n\n```python\n{snippet}\n```" for i in range(20))
+    pattern = highlight.re.compile(*highlight.LEXERS["python"])
+    cold = timed(lambda: highlight.tokens_to_html(pattern, snippet))
+    report("highlight python cold", cold)
+    highlight.highlight(snippet, "python")
+    report("highlight python memoized", timed(lambda: highlight.highlight(snippet, "python")), cold)
+    plain = page.replace("```python", "```")
+    baseline = timed(lambda: markdown_to_html_node(plain).to_html())
+    report("page 20 code blocks plain", baseline)
+    report("page 20 code blocks highlighted",
+           timed(lambda: markdown_to_html_node(page).to_html()), baseline)
+
+
+def make_site(root, pages):
+    # The real site plus generated pages, so the corpus links all resolve
+    shutil.copytree(CONTENT_DIR, Path(root) / "content")
+    shutil.copytree(CONTENT_DIR.parent / "static", Path(root) / "static")
+    sources = corpus_pages()
+    content = Path(root) / "content"
+    for i in range(pages):
+        page = content / f"section{i // 100}" / f"page{i}.md"
+        page.parent.mkdir(parents=True, exist_ok=True)
+        page.write_text(f"# Page {i}\n\n{sources[i % len(sources)]}")
+    template = Path(__file__).resolve().parent.parent / "template.html"
+    (Path(root) / "template.html").write_text(template.read_text())
+
+
+def bench_daemon(pages=10000):
+    import tempfile
+    from build import BuildConfig, build
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_site(root, pages)
+        config = BuildConfig(root / "content", root / "template.html", root / "static",
+                             root / "docs", root / ".cache")
+        page = root / "content" / "section0" / "page0.md"
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            state = build(config).state
+            cold = time.perf_counter() - start
+            # As in the daemon, caches are saved when idle, not per build
+            state.defer_save = True
+            fresh = timed(lambda: build(config), 1)
+            warm = timed(lambda: build(config, state), 3)
+            page.write_text("# Changed\n\nchanged")
+            changed = timed(lambda: build(config, state), 1)
+    report(f"site {pages} pages cold build", cold)
+    report(f"site {pages} pages rebuild, new state", fresh, cold)
+    report(f"site {pages} pages rebuild, warm state", warm, cold)
+    report(f"site {pages} pages one page changed, warm", changed, cold)
+
+
+def shared_page(i):
+    # Boilerplate every post has around text that is unique to the page
+    words = " ".join(f"word{i * 7 + j}" for j in range(40))
+    return (f"[< Back Home](/)\n\n# Post {i}\n\n## Introduction\n\n"
+            f"Post {i} is about **Tolkien** and {words}\n\n"
+            f"- See [the majesty post](/blog/majesty)\n- Item {i} with `code`\n\n"
+            f"## Conclusion\n\n{words} _again_")
+
+
+def bench_intern(pages=2000):
+    import render
+    from linkcheck import LinkChecker, collect_links
+    from search import SearchIndex, count_terms
+    texts = [shared_page(i) for i in range(pages)]
+
+    def render_site():
+        render.INLINE_FRAGMENTS.entries.clear()
+        for text in texts:
+            render.markdown_to_html_node(text).to_html()
+
+    length = render.INLINE_FRAGMENT_LENGTH
+    render.INLINE_FRAGMENT_LENGTH = 0
+    try:
+        plain = timed(render_site, 3)
+    finally:
+        render.INLINE_FRAGMENT_LENGTH = length
+    report(f"{pages} pages, no interning", plain)
+    report(f"{pages} pages, interned inline fragments", timed(render_site, 3), plain)
+
+    def index_site(intern):
+        search_index = SearchIndex()
+        link_checker = LinkChecker()
+        if not intern:
+            search_index.terms.intern = link_checker.urls.intern = lambda text: text
+        for i, text in enumerate(texts):
+            terms = {}
+            links = []
+
+            def on_text_nodes(text_nodes):
+                count_terms(text_nodes, terms)
+                collect_links(text_nodes, links)
+
+            render.markdown_to_html_node(text, on_text_nodes)
+            search_index.update(f"/post{i}/", f"Post {i}", terms)
+            link_checker.update(f"/post{i}/", f"post{i}.md", str(i), links)
+        return search_index, link_checker
+
+    plain, _ = memory(lambda: index_site(False))
+    interned, _ = memory(lambda: index_site(True))
+    print(f"{'search and link indexes, no interning':<40} {plain / 1024:8.0f} KiB retained")
+    print(f"{'search and link indexes, interned':<40} {interned / 1024:8.0f} KiB retained")
+    render.INLINE_FRAGMENTS.entries.clear()
+    search_index, link_checker = index_site(True)
+    for name, table in (("inline", render.INLINE_FRAGMENTS),
+                        ("terms", search_index.terms), ("urls", link_checker.urls)):
+        print(f"top {name} fragments:")
+        for key, refs in table.top(5):
+            print(f"    {refs:6d}  {key!r:.60}")
+
+
+def list_pipeline(text):
+    # text_to_html_nodes as it was when every stage returned a list
+    from markdown_parser import split_nodes_delimiter, split_nodes_image, split_nodes_link
+    from htmlnode import needs_escape
+    from render import text_nodes_to_html_nodes
+    from textnode import TextNode, TextType
+    bold = split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD)
+    italic = split_nodes_delimiter(bold, "_", TextType.ITALIC)
+    code = split_nodes_delimiter(italic, "`", TextType.CODE)
+    images = split_nodes_image(code)
+    links = split_nodes_link(images)
+    return text_nodes_to_html_nodes(links, not needs_escape(text))
+
+
+def bench_pipeline():
+    from markdown_parser import markdown_to_blocks
+    from render import text_to_html_nodes
+    paragraphs = [block.replace("\n", " ") for block in markdown_to_blocks(large_page(1))
+                  if not block.startswith(("#", "```", "-", ">", "1."))]
+    sizes = (("typical", max(paragraphs, key=len)),
+             ("200 joined", " ".join(paragraphs * (200 // len(paragraphs) + 1))))
+    for name, text in sizes:
+        assert [node.to_html() for node in list_pipeline(text)] == \
+            [node.to_html() for node in text_to_html_nodes(text)]
+        lists = timed(lambda: list_pipeline(text))
+        report(f"paragraph {name} list stages", lists)
+        report(f"paragraph {name} generator stages",
+               timed(lambda: text_to_html_nodes(text)), lists)
+        for label, func in (("list stages", list_pipeline), ("generator stages", text_to_html_nodes)):
+            _, peak = memory(lambda: func(text))
+            print(f"{f'paragraph {name} {label} memory':<40} {peak / 1024:8.1f} KiB peak")
+
+
+def changelog_table(rows):
+    lines = ["| Version | Date | Component | Change | Status | Notes |",
+             "|:--------|------|-----------|--------|:------:|------:|"]
+    for i in range(rows):
+        notes = f"see [#{i}](/issues/{i})" if i % 10 == 0 else "none"
+        lines.append(f"| 1.{i} | 2024-05-{i % 28 + 1:02} | parser | fixed item {i} | done | {notes} |")
+    return "\n".join(lines)
+
+
+def parent_node_table(block):
+    # One ParentNode per row and cell, every cell through the inline parser
+    from blocknode import split_table_row
+    from render import text_to_html_nodes
+    lines = block.split("\n")
+    header = [ParentNode("th", text_to_html_nodes(cell)) for cell in split_table_row(lines[0])]
+    rows = [ParentNode("tr", [ParentNode("td", text_to_html_nodes(cell))
+                              for cell in split_table_row(line)])
+            for line in lines[2:]]
+    return ParentNode("table", [ParentNode("thead", [ParentNode("tr", header)]),
+                                ParentNode("tbody", rows)])
+
+
+def bench_tables():
+    from render import table_to_html_node
+    for rows in (1000, 5000):
+        block = changelog_table(rows)
+        nodes = timed(lambda: parent_node_table(block).to_html())
+        report(f"table {rows} rows ParentNode per cell", nodes)
+        report(f"table {rows} rows TableNode",
+               timed(lambda: table_to_html_node(block).to_html()), nodes)
+        for name, func in (("ParentNode per cell", parent_node_table),
+                           ("TableNode", table_to_html_node)):
+            retained, _ = memory(lambda: func(block))
+            print(f"{f'table {rows} rows {name} memory':<40} {retained / 1024:8.0f} KiB retained")
+
+
+def bench_chunked(copies=400):
+    import tempfile
+    import main
+    root = Path(tempfile.mkdtemp())
+    (root / "page.md").write_text(large_page(copies))
+    (root / "template.html").write_text((CONTENT_DIR.parent / "template.html").read_text())
+    size = main.CHUNKED_PAGE_SIZE
+    print(f"{'page size':<40} {(root / 'page.md').stat().st_size / 1024:10.0f} KiB")
+    try:
+        results = {}
+        for name, limit in (("whole page", float("inf")), ("chunked", 0)):
+            main.CHUNKED_PAGE_SIZE = limit
+            dest = root / f"{name.replace(' ', '_')}.html"
+
+            def render():
+                dest.unlink(missing_ok=True)
+                main.render_page(root / "page.md", root / "template.html", dest)
+
+            results[name] = timed(render, repeat=3), memory(render)[1]
+        whole_time, whole_peak = results["whole page"]
+        for name, (seconds, peak) in results.items():
+            report(f"render_page {name}", seconds, whole_time)
+            print(f"{f'render_page {name} peak':<40} {peak / 1024:10.0f} KiB"
+                  f"  ({whole_peak / peak:5.2f}x)")
+    finally:
+        main.CHUNKED_PAGE_SIZE = size
+        shutil.rmtree(root)
+
+
+def register_extensions(count):
+    # count block and count inline extensions, none of which the corpus uses
+    from extensions import register_block, register_inline
+    for i in range(count):
+        first = ":%@~^"[i % 5]
+        register_block(f"block{i}", [f"{first * 3}ext{i}"],
+                       lambda block, hook, resolve: LeafNode("div", block))
+        register_inline(f"inline{i}", f"%%{i}%", rf"%%{i}%(.+?)%%",
+                        lambda match: LeafNode("span", match[1]))
+
+
+def bench_extensions():
+    from blocknode import block_to_block_type
+    from extensions import EXTENSIONS
+    from markdown_parser import markdown_to_blocks
+    pages = corpus_pages()
+    blocks = [block for page in pages for block in markdown_to_blocks(page)] * 20
+    try:
+        classify = render = None
+        for count in (0, 5, 20):
+            EXTENSIONS.clear()
+            register_extensions(count)
+            seconds = timed(lambda: [block_to_block_type(block) for block in blocks])
+            classify = classify or seconds
+            report(f"classify corpus, {count} extensions", seconds, classify)
+            throughput = corpus_throughput(rounds=10)
+            render = render or throughput
+            print(f"{f'render corpus, {count} extensions':<40} {throughput / 1024:10.0f} KiB/s"
+                  f"  ({throughput / render:5.2f}x)")
+    finally:
+        EXTENSIONS.clear()
+
+
+def bench_inline():
+    import markdown_parser
+    import render
+    fast = markdown_parser.has_inline_markup
+    pages = corpus_pages()
+    page = large_page()
+    plain = sum(not fast(block) for block in markdown_parser.markdown_to_blocks(page))
+    print(f"{'corpus blocks without inline markup':<40} {plain}/"
+          f"{len(markdown_parser.markdown_to_blocks(page))}")
+
+    def content():
+        for source in pages:
+            render.markdown_to_html_node(source, lambda text_nodes: None)
+
+    results = {}
+    # has_inline_markup also decides what inline_fragment memoizes, so with
+    # interning on the "full parse" runs would time the fragment table
+    length = render.INLINE_FRAGMENT_LENGTH
+    render.INLINE_FRAGMENT_LENGTH = -1
+    render.INLINE_FRAGMENTS.clear()
+    try:
+        for name, check in (("full parse", lambda text: True), ("fast path", fast)):
+            markdown_parser.has_inline_markup = render.has_inline_markup = check
+            results[name] = (
+                timed(content),
+                timed(lambda: render.markdown_to_html_node(page)),
+            )
+    finally:
+        markdown_parser.has_inline_markup = render.has_inline_markup = fast
+        render.INLINE_FRAGMENT_LENGTH = length
+    for index, name in enumerate(("content/ posts", f"corpus {len(page) // 1024} KiB")):
+        baseline = results["full parse"][index]
+        report(f"{name} full parse", baseline)
+        report(f"{name} fast path", results["fast path"][index], baseline)
+
+
+def import_time(module, repeat=5):
+    # Cumulative microseconds reported by -X importtime in a fresh interpreter
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True,
+            check=True)
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                micros = int(fields[1])
+                best = micros if best is None or micros < best else best
+    return best / 1e6
+
+
+def bench_import():
+    for module in ("render", "main", "build"):
+        report(f"import {module}", import_time(module))
+
+
+BENCHMARKS = {
+    "to_html": bench_to_html,
+    "flatdoc": bench_flatdoc,
+    "escape": bench_escape,
+    "tags": bench_tags,
+    "lists": bench_lists,
+    "toc": bench_toc,
+    "highlight": bench_highlight,
+    "daemon": bench_daemon,
+    "intern": bench_intern,
+    "pipeline": bench_pipeline,
+    "tables": bench_tables,
+    "chunked": bench_chunked,
+    "inline": bench_inline,
+    "extensions": bench_extensions,
+    "import": bench_import,
+    "throughput": bench_throughput,
+}
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
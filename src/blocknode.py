@@ -1,4 +1,10 @@
+import re
 from enum import Enum
+from extensions import EXTENSIONS
+
+LIST_ITEM_PATTERN = re.compile(r"( *)(?:(-)|(\d+)\.) ")
+TABLE_DELIMITER_PATTERN = re.compile(r" *\|? *:?-+:? *(?:\| *:?-+:? *)*\|? *")
+TABLE_CELL_PATTERN = re.compile(r"(?<!\\)\|")
 
 
 class BlockType(Enum):
@@ -8,13 +14,46 @@ class BlockType(Enum):
     QUOTE = "q"
     UNORDERED_LIST = "ul"
     ORDERED_LIST = "ol"
+    TABLE = "table"
+
+
+def list_item_kind(line):
+    match = LIST_ITEM_PATTERN.match(line)
+    if match is None:
+        return None
+    return BlockType.UNORDERED_LIST if match[2] else BlockType.ORDERED_LIST
+
+
+def split_table_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    if "\\|" in line:
+        return [cell.strip().replace("\\|", "|") for cell in TABLE_CELL_PATTERN.split(line)]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def is_table(lines):
+    # A header row and a delimiter row with the same number of columns
+    return (len(lines) >= 2 and "|" in lines[0] and "-" in lines[1]
+            and TABLE_DELIMITER_PATTERN.fullmatch(lines[1]) is not None
+            and len(split_table_row(lines[0])) == len(split_table_row(lines[1])))
 
 
 def block_to_block_type(block):
+    # Registered extensions come first; a block is only tried against the
+    # ones sharing its first character
+    if EXTENSIONS.blocks:
+        extension = EXTENSIONS.block_extension(block)
+        if extension is not None:
+            return extension
+
     lines = block.split('\n')
 
     # Code blocks (check first and last lines)
-    if len(lines) >= 2 and lines[0].strip() == '```' and lines[-1].strip() == '```':
+    if len(lines) >= 2 and lines[0].startswith('```') and lines[-1].strip() == '```':
         return BlockType.CODE
 
     # Headings (single line only)
@@ -34,18 +73,14 @@ def block_to_block_type(block):
     if all(line.startswith('>') for line in lines):
         return BlockType.QUOTE
 
-    # Unordered lists
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
-
-    # Ordered lists
-    ordered_pattern = True
-    for i, line in enumerate(lines, 1):
-        if not line.strip().startswith(f"{i}. "):
-            ordered_pattern = False
-            break
-    if ordered_pattern:
-        return BlockType.ORDERED_LIST
+    # Lists; the first item decides the kind, later lines may be nested
+    # items or continuation text
+    kind = list_item_kind(lines[0])
+    if kind is not None:
+        return kind
+
+    if is_table(lines[:2]):
+        return BlockType.TABLE
 
     # Default to paragraph
     return BlockType.PARAGRAPH
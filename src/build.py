@@ -0,0 +1,423 @@
+import fnmatch
+import os
+import time
+from pathlib import Path
+
+from buildgraph import BuildGraph, Task
+from events import EVENT_LOG, emit
+from feeds import write_feeds
+from linkcheck import LinkChecker
+from limits import page_limits
+from main import PageError, page_url, record_page, render_page
+from metadata import MetadataIndex
+from outputs import copy_if_changed, prune
+from render import RenderCache
+from search import SearchIndex
+from urls import UrlResolver, asset_manifest
+
+SITE_URL = "https://tagir-a.github.io"
+# Outputs that the search index and feed writers keep up to date themselves
+MANAGED_OUTPUTS = ("search/*", "sitemap.xml", "sitemap-*.xml", "atom.xml")
+PAGE_CPU_LIMIT = 30
+PAGE_MEMORY_LIMIT = 2048
+
+
+class BuildConfig:
+    def __init__(self, content_dir="./content", template_path="./template.html",
+                 static_dir="./static", dest_dir="./docs", cache_dir="./.cache",
+                 basepath="", site_url=SITE_URL, jobs=1, dry_run=False, only=None,
+                 hash_assets=False, page_cpu_limit=PAGE_CPU_LIMIT,
+                 page_memory_limit=PAGE_MEMORY_LIMIT, event_log=None, flat_document=False):
+        self.content_dir = Path(content_dir)
+        self.template_path = Path(template_path)
+        self.static_dir = Path(static_dir)
+        self.dest_dir = Path(dest_dir)
+        self.cache_dir = Path(cache_dir)
+        self.basepath = basepath
+        self.site_url = site_url
+        self.jobs = jobs
+        self.dry_run = dry_run
+        self.only = only
+        self.hash_assets = hash_assets
+        # Per page, in seconds and MiB; only enforced in worker processes
+        self.page_cpu_limit = page_cpu_limit
+        self.page_memory_limit = page_memory_limit
+        # JSON lines file the build appends its events to, if any
+        self.event_log = Path(event_log) if event_log else None
+        # Render pages through a FlatDocument instead of a node tree
+        self.flat_document = flat_document
+
+    def page_limits(self):
+        if self.jobs <= 1:
+            return None
+        return self.page_cpu_limit, self.page_memory_limit * 1024 * 1024
+
+    def selected(self, relative_path):
+        return self.only is None or fnmatch.fnmatch(relative_path, self.only)
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default="",
+                        help="url prefix the site is served under")
+    parser.add_argument("--content", default="./content")
+    parser.add_argument("--template", default="./template.html")
+    parser.add_argument("--static", default="./static")
+    parser.add_argument("--dest", default="./docs")
+    parser.add_argument("--cache", default="./.cache")
+    parser.add_argument("--site-url", default=SITE_URL)
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="print the tasks that would run")
+    parser.add_argument("--only", metavar="GLOB",
+                        help="only render pages and copy assets matching GLOB")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="copy static files under content-hashed names")
+    parser.add_argument("--page-cpu-limit", type=float, default=PAGE_CPU_LIMIT,
+                        metavar="SECONDS",
+                        help="CPU time a page may take in a worker process (0: no limit)")
+    parser.add_argument("--page-memory-limit", type=int, default=PAGE_MEMORY_LIMIT,
+                        metavar="MIB",
+                        help="address space of a worker process while it renders"
+                             " a page (0: no limit)")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="append build events to PATH as JSON lines")
+    parser.add_argument("--flat-document", action="store_true",
+                        help="render pages as flat event arrays; less memory per page,"
+                             " no render cache")
+    args = parser.parse_args(argv)
+    return BuildConfig(args.content, args.template, args.static, args.dest,
+                       args.cache, args.basepath, args.site_url, args.jobs,
+                       args.dry_run, args.only, args.hash_assets,
+                       args.page_cpu_limit, args.page_memory_limit, args.event_log,
+                       args.flat_document)
+
+
+def discover_pages(content_dir):
+    root = Path(content_dir)
+    for item in sorted(root.rglob("*")):
+        if item.is_file():
+            relative = item.relative_to(root).with_suffix(".html")
+            yield item, relative, page_url(relative)
+
+
+def discover_assets(static_dir):
+    root = Path(static_dir)
+    if not root.is_dir():
+        return
+    for item in sorted(root.rglob("*")):
+        if item.is_file():
+            yield item, item.relative_to(root)
+
+
+def copy_file(src, dest):
+    return copy_if_changed(src, dest)
+
+
+def render_task(source, template_path, target, url, resolve_url, render_cache, limits,
+                flat=False):
+    # A page that fails comes back as its PageError instead of stopping
+    # the build
+    try:
+        if limits is None:
+            return render_page(source, template_path, target, url, resolve_url, render_cache,
+                               flat)
+        with page_limits(*limits):
+            return render_page(source, template_path, target, url, resolve_url, render_cache,
+                               flat)
+    except PageError as error:
+        return error
+
+
+def stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def tree_stamp(root):
+    # Adding, removing or renaming a file changes its directory's mtime, so
+    # this only changes when the listing of the tree might have
+    return [(dirpath, stamp(dirpath)) for dirpath, _, _ in os.walk(root)]
+
+
+class SiteFiles:
+    # The discovered pages and assets of a site with everything derived
+    # from their paths worked out once
+    def __init__(self, config, manifest):
+        self.pages = list(discover_pages(config.content_dir))
+        self.assets = list(discover_assets(config.static_dir))
+        self.names = [source.relative_to(config.content_dir).as_posix()
+                      for source, _, _ in self.pages]
+        self.urls = [url for _, _, url in self.pages]
+        self.page_outputs = [config.dest_dir / relative for _, relative, _ in self.pages]
+        self.targets = {}
+        for source, relative in self.assets:
+            path = "/" + relative.as_posix()
+            self.targets[relative.as_posix()] = manifest.get(path, path).lstrip("/")
+        self.asset_outputs = [config.dest_dir / self.targets[relative.as_posix()]
+                              for _, relative in self.assets]
+        self.outputs = set(self.targets.values())
+        self.outputs.update(relative.as_posix() for _, relative, _ in self.pages)
+        self.link_targets = {"/" + relative.as_posix() for _, relative in self.assets}
+        self.link_targets.update(self.urls)
+
+
+def state_key(config):
+    # Relative paths in a config depend on the directory it is used from
+    return (Path.cwd(), config.content_dir, config.template_path, config.static_dir,
+            config.dest_dir, config.cache_dir, config.basepath, config.hash_assets)
+
+
+class BuildState:
+    # Everything a long-lived build process (see daemon.py) keeps between
+    # builds of one site: the loaded caches, the render cache, the file
+    # listing and a manifest of the source stamps each output was last
+    # built from
+    def __init__(self, config):
+        self.key = state_key(config)
+        self.index = MetadataIndex.load(config.cache_dir / "metadata.json")
+        self.search_index = SearchIndex.load(config.cache_dir / "search.json")
+        self.link_checker = LinkChecker.load(config.cache_dir / "links.json")
+        self.stamps = {}
+        self.tree_stamp = None
+        self.template_stamp = None
+        self.assets_stamp = None
+        self.resolve_url = None
+        self.render_cache = None
+        self.files = None
+        self.pruned = None
+        self.broken = None
+        # A daemon saves the caches when it goes idle instead of after
+        # every build
+        self.defer_save = False
+        self.unsaved = False
+
+    def matches(self, config):
+        return self.key == state_key(config)
+
+    def prepare(self, config):
+        if self.resolve_url is None:
+            self.use_assets(config, asset_manifest(config.static_dir) if config.hash_assets else {})
+        tree = (tree_stamp(config.content_dir), tree_stamp(config.static_dir))
+        if self.files is None or tree != self.tree_stamp:
+            self.files = SiteFiles(config, self.resolve_url.assets)
+            self.tree_stamp = tree
+        # Pages only need re-rendering when their source changed, unless
+        # the template or the asset urls did
+        assets_stamp = [stamp(source) for source, _ in self.files.assets]
+        if assets_stamp != self.assets_stamp:
+            if self.assets_stamp is not None and config.hash_assets:
+                manifest = asset_manifest(config.static_dir)
+                if manifest != self.resolve_url.assets:
+                    self.use_assets(config, manifest)
+                    self.files = SiteFiles(config, manifest)
+            self.assets_stamp = assets_stamp
+        template_stamp = stamp(config.template_path)
+        if template_stamp != self.template_stamp:
+            self.stamps.clear()
+            self.template_stamp = template_stamp
+        return self.files
+
+    def save(self, cache_dir):
+        cache = Path(cache_dir)
+        self.index.save(cache / "metadata.json")
+        self.search_index.save(cache / "search.json")
+        self.link_checker.save(cache / "links.json")
+        self.unsaved = False
+
+    def use_assets(self, config, manifest):
+        self.resolve_url = UrlResolver(config.basepath, manifest)
+        self.render_cache = RenderCache(self.resolve_url)
+        self.stamps.clear()
+
+    def is_fresh(self, source, dest, source_stamp):
+        return self.stamps.get(source) == source_stamp and os.path.exists(dest)
+
+
+def build(config, state=None):
+    # A state carried over from an earlier build lets unchanged pages and
+    # assets be skipped; without one everything is built
+    start = time.perf_counter()
+    warm = state is not None and state.matches(config)
+    if not warm:
+        state = BuildState(config)
+    if config.event_log is not None and not config.dry_run:
+        EVENT_LOG.open(config.event_log, build=os.urandom(6).hex())
+    try:
+        return _build(config, state, start, warm)
+    except Exception as error:
+        emit("build_error", message=f"{type(error).__name__}: {error}")
+        raise
+    finally:
+        EVENT_LOG.close()
+
+
+def _build(config, state, start, warm):
+    cache = config.cache_dir
+    dest = config.dest_dir
+    index = state.index
+    search_index = state.search_index
+    link_checker = state.link_checker
+    files = state.prepare(config)
+    pages = files.pages
+    assets = files.assets
+    resolve_url = state.resolve_url
+    # Worker processes would each get a pickled copy, so only in-process
+    # builds use the render cache
+    render_cache = state.render_cache if config.jobs <= 1 else None
+    limits = config.page_limits()
+    cache_hits = state.render_cache.hits
+    cache_misses = state.render_cache.misses
+
+    graph = BuildGraph()
+    setup = []
+    if config.only is None and files.outputs != state.pruned:
+        # Unchanged outputs stay in place so their mtimes survive; only
+        # files this build no longer produces are removed. Partial builds
+        # must keep the pages they don't touch.
+        def prune_outputs():
+            removed = prune(dest, files.outputs, MANAGED_OUTPUTS)
+            state.pruned = files.outputs
+            emit("prune", dest=str(dest), removed=removed)
+            return removed
+
+        setup.append(graph.add(Task("prune", prune_outputs, local=True)))
+
+    copies = []
+    skipped = 0
+    stamps = {}
+    for (source, relative), target in zip(assets, files.asset_outputs):
+        if config.selected(relative.as_posix()):
+            stamps[source] = stamp(source)
+            if state.is_fresh(source, target, stamps[source]):
+                skipped += 1
+                continue
+            copies.append(graph.add(Task(
+                f"copy {relative.as_posix()}", copy_file, (source, target), setup)))
+
+    renders = []
+    for (source, _, url), name, target in zip(pages, files.names, files.page_outputs):
+        if config.selected(name):
+            stamps[source] = stamp(source)
+            if state.is_fresh(source, target, stamps[source]):
+                skipped += 1
+                continue
+            renders.append(graph.add(Task(
+                f"render {name}", render_task,
+                (source, config.template_path, target, url, resolve_url, render_cache, limits,
+                 config.flat_document),
+                setup)))
+
+    def update_indexes():
+        # Failed pages keep their old index entries and stay unstamped, so
+        # the next build tries them again
+        generation = index.generation
+        for task in renders:
+            result = task.result
+            if isinstance(result, PageError):
+                emit("page_error", source=result.source, stage=result.stage,
+                     seconds=round(result.elapsed, 6), message=result.message)
+                continue
+            record_page(result, index, search_index, link_checker)
+            emit("page", page=result.meta.path, source=result.source, bytes=result.size,
+                 written=result.written, cache_hits=result.cache_hits,
+                 seconds=round(sum(result.timings.values()), 6), stages=result.timings)
+        for task in copies:
+            emit("copy", source=str(task.args[0]), target=str(task.args[1]),
+                 written=task.result)
+        for task in renders + copies:
+            if not isinstance(task.result, PageError):
+                source = task.args[0]
+                state.stamps[source] = stamps[source]
+        index.retain(files.urls)
+        search_index.retain(files.urls)
+        link_checker.retain(files.urls)
+        if len(state.stamps) > len(pages) + len(assets):
+            sources = {source for source, _, _ in pages}
+            sources.update(source for source, _ in assets)
+            for source in list(state.stamps):
+                if source not in sources:
+                    del state.stamps[source]
+        return bool(renders) or index.generation != generation
+
+    indexed = graph.add(Task("update indexes", update_indexes, deps=renders + copies,
+                             local=True))
+
+    def check_links():
+        # With no page rendered and the same files, last build's answer holds
+        if indexed.result or state.broken is None or state.broken[0] is not files:
+            state.broken = (files, link_checker.check(files.link_targets))
+        broken = state.broken[1]
+        for link in broken:
+            print(link)
+        return broken
+
+    def report_failures():
+        failures = [task.result for task in renders if isinstance(task.result, PageError)]
+        for failure in failures:
+            print(failure)
+        return failures
+
+    def write_site_feeds():
+        home = index.get("/")
+        return write_feeds(index, dest, config.site_url + resolve_url.basepath,
+                           home.title if home else config.site_url,
+                           stamp=cache / "feeds.json")
+
+    failed = graph.add(Task("report failures", report_failures, deps=[indexed], local=True))
+    checked = graph.add(Task("check links", check_links, deps=[indexed], local=True))
+    finish = [
+        failed,
+        checked,
+        graph.add(Task("write search index", search_index.write, (dest,),
+                       [indexed], local=True)),
+        graph.add(Task("write feeds", write_site_feeds, deps=[indexed], local=True)),
+    ]
+
+    def save_caches():
+        if indexed.result:
+            state.unsaved = True
+        if state.unsaved and not state.defer_save:
+            state.save(cache)
+            return True
+        return False
+
+    saved = graph.add(Task("save caches", save_caches, deps=finish, local=True))
+
+    def report_writes():
+        written = sum(task.result for task in copies)
+        written += sum(task.result.written for task in renders
+                       if not isinstance(task.result, PageError))
+        stats = {
+            "written": written,
+            "unchanged": len(copies) + len(renders) + skipped - written - len(failed.result),
+            "pruned": len(setup[0].result) if setup else 0,
+        }
+        print(f"{stats['written']} files written, {stats['unchanged']} unchanged,"
+              f" {stats['pruned']} removed")
+        return stats
+
+    reported = graph.add(Task("report writes", report_writes, deps=[saved] + copies,
+                              local=True))
+
+    emit("build_start", jobs=config.jobs, pages=len(pages), assets=len(assets), warm=warm,
+         only=config.only)
+    tasks = graph.run(config.jobs, config.dry_run)
+    if reported.result is not None:
+        emit("build_end", seconds=round(time.perf_counter() - start, 6),
+             rendered=len(renders), copied=len(copies), skipped=skipped,
+             failed=len(failed.result), broken_links=len(checked.result),
+             cache_hits=state.render_cache.hits - cache_hits,
+             cache_misses=state.render_cache.misses - cache_misses,
+             **reported.result)
+    if config.dry_run:
+        for task in tasks:
+            print(task.name)
+    graph.state = state
+    graph.failures = failed.result or []
+    return graph
@@ -0,0 +1,86 @@
+class Task:
+    def __init__(self, name, action, args=(), deps=None, local=False):
+        # Non-local tasks may run in a worker process, so their action and
+        # args must be picklable; local tasks always run in this process
+        self.name = name
+        self.action = action
+        self.args = args
+        self.deps = list(deps) if deps else []
+        self.local = local
+        self.result = None
+
+    def run(self):
+        return self.action(*self.args)
+
+    def __repr__(self):
+        return f"Task({self.name})"
+
+
+class BuildGraph:
+    def __init__(self):
+        self.tasks = []
+        self.names = set()
+        # Set by build.build for its callers: the state to pass to the next
+        # build, and the PageErrors of the pages that failed
+        self.state = None
+        self.failures = []
+
+    def add(self, task):
+        if task.name in self.names:
+            raise ValueError(f"Duplicate task {task.name}")
+        for dep in task.deps:
+            if dep.name not in self.names:
+                raise ValueError(f"Unknown dependency {dep.name} of {task.name}")
+        self.names.add(task.name)
+        self.tasks.append(task)
+        return task
+
+    def order(self):
+        # Tasks can only depend on tasks added before them, so insertion
+        # order is already a valid topological order
+        return list(self.tasks)
+
+    def run(self, jobs=1, dry_run=False):
+        if dry_run:
+            return self.order()
+        if jobs <= 1:
+            for task in self.order():
+                task.result = task.run()
+            return self.order()
+        self._run_parallel(jobs)
+        return self.order()
+
+    def _run_parallel(self, jobs):
+        # Only parallel builds pay for importing multiprocessing
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        waiting = {task: len(task.deps) for task in self.tasks}
+        dependents = {task: [] for task in self.tasks}
+        for task in self.tasks:
+            for dep in task.deps:
+                dependents[dep].append(task)
+        ready = [task for task in self.tasks if not task.deps]
+        running = {}
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while ready or running:
+                while ready:
+                    task = ready.pop(0)
+                    if task.local:
+                        task.result = task.run()
+                        ready.extend(self._finish(task, waiting, dependents))
+                    else:
+                        running[pool.submit(task.action, *task.args)] = task
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    task.result = future.result()
+                    ready.extend(self._finish(task, waiting, dependents))
+
+    def _finish(self, task, waiting, dependents):
+        unblocked = []
+        for dependent in dependents[task]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                unblocked.append(dependent)
+        return unblocked
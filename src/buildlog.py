@@ -0,0 +1,147 @@
+import argparse
+import math
+import sys
+import time
+
+from events import read_events
+
+STAGE_ORDER = ("read", "front matter", "parse", "render", "write", "stream", "index")
+
+
+def percentile(values, fraction):
+    # Nearest rank, so every reported value is one that was measured
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class BuildSummary:
+    def __init__(self, build):
+        self.build = build
+        self.started = None
+        self.end = None
+        self.pages = []
+        self.errors = []
+
+    def add(self, event):
+        kind = event.get("event")
+        if self.started is None or event["time"] < self.started:
+            self.started = event["time"]
+        if kind == "page":
+            self.pages.append(event)
+        elif kind == "page_error":
+            self.errors.append(event)
+        elif kind == "build_end":
+            self.end = event
+
+    @property
+    def seconds(self):
+        return self.end["seconds"] if self.end else None
+
+    def page_seconds(self):
+        return [page["seconds"] for page in self.pages]
+
+
+def group_builds(events):
+    builds = {}
+    for event in events:
+        build = event.get("build")
+        if build is None or "time" not in event:
+            continue
+        summary = builds.get(build)
+        if summary is None:
+            summary = builds[build] = BuildSummary(build)
+        summary.add(event)
+    return sorted(builds.values(), key=lambda summary: summary.started)
+
+
+def stage_seconds(builds):
+    stages = {}
+    for build in builds:
+        for page in build.pages:
+            for stage, seconds in page.get("stages", {}).items():
+                stages.setdefault(stage, []).append(seconds)
+            stages.setdefault("total", []).append(page["seconds"])
+    order = {stage: i for i, stage in enumerate(STAGE_ORDER + ("total",))}
+    return dict(sorted(stages.items(), key=lambda item: order.get(item[0], len(order) - 1)))
+
+
+def change(current, previous):
+    if current is None or not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+def format_summary(builds, top=5):
+    lines = []
+    if not builds:
+        return "no builds in the logs"
+    first = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(builds[0].started))
+    last = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(builds[-1].started))
+    lines.append(f"{len(builds)} builds from {first} to {last}")
+    lines.append("")
+    lines.append(f"{'build':<12} {'started':<19} {'seconds':>8} {'change':>7} {'pages':>6}"
+                 f" {'failed':>6} {'p50 ms':>8} {'p90 ms':>8} {'KiB':>8} {'hits':>6}")
+    previous = None
+    for build in builds:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(build.started))
+        seconds = build.seconds
+        pages = build.page_seconds()
+        size = sum(page.get("bytes", 0) for page in build.pages if page.get("written"))
+        hits = build.end.get("cache_hits", 0) if build.end else 0
+        seconds_text = f"{seconds:8.3f}" if seconds is not None else f"{'-':>8}"
+        lines.append(f"{build.build:<12} {started:<19} {seconds_text} {change(seconds, previous):>7}"
+                     f" {len(pages):6d} {len(build.errors):6d}"
+                     f" {percentile(pages, 0.5) * 1000:8.2f} {percentile(pages, 0.9) * 1000:8.2f}"
+                     f" {size / 1024:8.1f} {hits:6d}")
+        if seconds is not None:
+            previous = seconds
+    stages = stage_seconds(builds)
+    if stages:
+        lines.append("")
+        lines.append(f"{'page stage':<14} {'count':>7} {'p50 ms':>8} {'p90 ms':>8}"
+                     f" {'p99 ms':>8} {'max ms':>8}")
+        for stage, values in stages.items():
+            lines.append(f"{stage:<14} {len(values):7d}"
+                         + "".join(f" {percentile(values, fraction) * 1000:8.2f}"
+                                   for fraction in (0.5, 0.9, 0.99, 1.0)))
+    pages = sorted((page for build in builds for page in build.pages),
+                   key=lambda page: page["seconds"], reverse=True)[:top]
+    if pages:
+        lines.append("")
+        lines.append("slowest pages:")
+        for page in pages:
+            stages = page.get("stages") or {"": 0}
+            slowest = max(stages, key=stages.get)
+            lines.append(f"{page['seconds'] * 1000:10.2f} ms  {page['page']}  (mostly {slowest})")
+    errors = [error for build in builds for error in build.errors]
+    if errors:
+        lines.append("")
+        lines.append("failed pages:")
+        for error in errors:
+            lines.append(f"    {error['source']}: {error['stage']} after"
+                         f" {error['seconds']:.2f}s: {error['message']}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Summarize build event logs: per-build trends and page stage percentiles.")
+    parser.add_argument("logs", nargs="+", help="event logs written with build --event-log")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest pages to list")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    events = []
+    for path in args.logs:
+        events.extend(read_events(path))
+    print(format_summary(group_builds(events), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
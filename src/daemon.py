@@ -0,0 +1,129 @@
+import json
+import os
+import socket
+import sys
+
+# The client side only needs the standard library; the build modules are
+# imported by the server, once
+SOCKET_PATH = os.environ.get("SITE_DAEMON_SOCKET", ".cache/daemon.sock")
+# Seconds without a request before the caches are written to disk
+IDLE_SAVE_DELAY = 2.0
+
+
+def request(message, socket_path=SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reply:
+            return json.loads(reply.readline())
+
+
+class BuildServer:
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = str(socket_path)
+        self.state = None
+        self.cache_dir = None
+        self.running = False
+
+    def save(self):
+        if self.state is not None and self.state.unsaved:
+            self.state.save(self.cache_dir)
+
+    def handle(self, message):
+        import contextlib
+        import io
+        import time
+        import traceback
+        from build import BuildState, build, parse_args
+        if message.get("stop"):
+            self.running = False
+            return {"output": "", "status": 0}
+        start = time.perf_counter()
+        output = io.StringIO()
+        status = 0
+        cwd = os.getcwd()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                # Relative paths in argv are the client's
+                os.chdir(message["cwd"])
+                config = parse_args(message["argv"])
+                if self.state is not None and not self.state.matches(config):
+                    self.save()
+                    self.state = None
+                if self.state is None:
+                    self.state = BuildState(config)
+                    self.state.defer_save = True
+                    self.cache_dir = config.cache_dir.resolve()
+                if build(config, self.state).failures:
+                    status = 1
+            except SystemExit as error:
+                status = error.code if isinstance(error.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+                # Whatever failed may have left the state half updated
+                self.state = None
+            finally:
+                os.chdir(cwd)
+        return {"output": output.getvalue(), "status": status,
+                "seconds": time.perf_counter() - start}
+
+    def serve_connection(self, connection):
+        # A client that sends nothing, sends garbage or hangs up before its
+        # reply only loses its own request; the server keeps going
+        try:
+            with connection.makefile("rwb") as stream:
+                line = stream.readline()
+                if not line.strip():
+                    return
+                reply = self.handle(json.loads(line))
+                stream.write(json.dumps(reply).encode("utf-8") + b"\n")
+        except (ValueError, OSError) as error:
+            print(f"dropped a request: {error}", file=sys.stderr)
+
+    def serve_forever(self, ready=None):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(self.socket_path)
+            server.listen()
+            self.running = True
+            if ready is not None:
+                ready()
+            server.settimeout(IDLE_SAVE_DELAY)
+            try:
+                while self.running:
+                    try:
+                        connection, _ = server.accept()
+                    except TimeoutError:
+                        self.save()
+                        continue
+                    connection.settimeout(None)
+                    with connection:
+                        self.serve_connection(connection)
+            finally:
+                self.save()
+                os.unlink(self.socket_path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        BuildServer().serve_forever(lambda: print(f"listening on {SOCKET_PATH}"))
+        return 0
+    if argv[:1] == ["stop"]:
+        request({"stop": True})
+        return 0
+    try:
+        reply = request({"argv": argv, "cwd": os.getcwd()})
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"no build daemon on {SOCKET_PATH}, building in this process", file=sys.stderr)
+        from build import build, parse_args
+        return 1 if build(parse_args(argv)).failures else 0
+    sys.stdout.write(reply["output"])
+    return reply["status"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
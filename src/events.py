@@ -0,0 +1,60 @@
+import json
+import os
+import time
+
+
+class EventLog:
+    # Build events as JSON lines, one object per line with "time" and
+    # "event" keys. Nothing is written, and emit costs one attribute check,
+    # until the log is opened.
+    def __init__(self):
+        self.file = None
+        self.fields = {}
+
+    @property
+    def enabled(self):
+        return self.file is not None
+
+    def open(self, path, **fields):
+        # Appends, so several builds can share one log; fields are added to
+        # every event until the log is closed
+        self.close()
+        os.makedirs(os.path.dirname(os.fspath(path)) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.fields = fields
+
+    def emit(self, event, **fields):
+        if self.file is None:
+            return
+        record = {"time": round(time.time(), 6), "event": event}
+        record.update(self.fields)
+        record.update(fields)
+        self.file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.fields = {}
+
+
+EVENT_LOG = EventLog()
+
+
+def emit(event, **fields):
+    EVENT_LOG.emit(event, **fields)
+
+
+def read_events(path):
+    events = []
+    with open(path, encoding="utf-8") as lines:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                # A build killed mid-write leaves a partial last line
+                continue
+    return events
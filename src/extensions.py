@@ -0,0 +1,120 @@
+import re
+from textnode import TextNode, TextType
+
+
+class BlockExtension:
+    # A block type of its own: blocks starting with one of prefixes (and
+    # passing match, if given) are rendered by
+    # render(block, on_text_nodes, resolve_url) -> HTMLNode
+    def __init__(self, name, prefixes, render, match=None):
+        if not prefixes or not all(prefixes):
+            raise ValueError(f"Block extension {name} needs a non-empty prefix")
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.render = render
+        self.match = match
+
+    def matches(self, block):
+        return block.startswith(self.prefixes) and (self.match is None or self.match(block))
+
+    def __repr__(self):
+        return f"BlockExtension({self.name!r}, {self.prefixes!r})"
+
+
+class InlineExtension:
+    # Inline markup found by pattern in plain text containing trigger; each
+    # match becomes render(match) -> HTMLNode
+    def __init__(self, name, trigger, pattern, render):
+        if not trigger:
+            raise ValueError(f"Inline extension {name} needs a trigger")
+        self.name = name
+        self.trigger = trigger
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.render = render
+
+    def __repr__(self):
+        return f"InlineExtension({self.name!r}, {self.trigger!r})"
+
+
+class ExtensionTextNode(TextNode):
+    def __init__(self, text, extension, match):
+        super().__init__(text, TextType.EXTENSION)
+        self.extension = extension
+        self.match = match
+
+
+class ExtensionRegistry:
+    def __init__(self):
+        # Called whenever the extensions change, for tables that hold
+        # results parsed under the old ones
+        self.listeners = []
+        self.clear()
+
+    def clear(self):
+        # Block extensions by the first character of their prefixes, so a
+        # block only ever meets the extensions that could match it
+        self.blocks = {}
+        self.inlines = {}
+        # One scan finds any trigger however many extensions there are
+        self.trigger_pattern = None
+        self._changed()
+
+    def _changed(self):
+        for listener in self.listeners:
+            listener()
+
+    def add_block(self, extension):
+        for first in dict.fromkeys(prefix[0] for prefix in extension.prefixes):
+            self.blocks.setdefault(first, []).append(extension)
+        self._changed()
+        return extension
+
+    def add_inline(self, extension):
+        self.inlines.setdefault(extension.trigger, []).append(extension)
+        triggers = sorted(self.inlines, key=len, reverse=True)
+        self.trigger_pattern = re.compile("|".join(map(re.escape, triggers)))
+        self._changed()
+        return extension
+
+    def block_extension(self, block):
+        for extension in self.blocks.get(block[:1], ()):
+            if extension.matches(block):
+                return extension
+        return None
+
+    def has_triggers(self, text):
+        return self.trigger_pattern is not None and self.trigger_pattern.search(text) is not None
+
+    def split_inline(self, text):
+        # Plain text and extension nodes, taking the earliest match of the
+        # extensions whose triggers occur in text
+        candidates = [extension for trigger in dict.fromkeys(self.trigger_pattern.findall(text))
+                      for extension in self.inlines[trigger]]
+        position = 0
+        while True:
+            best = None
+            for extension in candidates:
+                match = extension.pattern.search(text, position)
+                if match is not None and match.end() > match.start() and (
+                        best is None or match.start() < best[1].start()):
+                    best = extension, match
+            if best is None:
+                break
+            extension, match = best
+            if match.start() > position:
+                yield TextNode(text[position:match.start()], TextType.TEXT)
+            yield ExtensionTextNode(match[0], extension, match)
+            position = match.end()
+        if position < len(text):
+            yield TextNode(text[position:], TextType.TEXT)
+
+
+EXTENSIONS = ExtensionRegistry()
+
+
+def register_block(name, prefixes, render, match=None):
+    return EXTENSIONS.add_block(BlockExtension(name, prefixes, render, match))
+
+
+def register_inline(name, trigger, pattern, render):
+    return EXTENSIONS.add_inline(InlineExtension(name, trigger, pattern, render))
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+# xml.sax.saxutils pulls in urllib.request and http.client at import time;
+# the HTML attribute escaper covers everything XML needs here
+from htmlnode import escape_attr as escape
+
+SITEMAP_URL_LIMIT = 50000
+FEED_ENTRY_LIMIT = 20
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def absolute_url(site_url, path):
+    return site_url.rstrip("/") + path
+
+
+def atom_date(date):
+    # Front matter dates are plain YYYY-MM-DD; Atom wants RFC 3339
+    if len(date) == 10:
+        return f"{date}T00:00:00Z"
+    return date
+
+
+def write_sitemap(pages, dest_dir, site_url, limit=SITEMAP_URL_LIMIT):
+    dest = Path(dest_dir)
+    pages = sorted(pages, key=lambda page: page.path)
+    if len(pages) <= limit:
+        _write_urlset(dest / "sitemap.xml", pages, site_url)
+        files = ["sitemap.xml"]
+    else:
+        files = []
+        for start in range(0, len(pages), limit):
+            name = f"sitemap-{start // limit + 1}.xml"
+            _write_urlset(dest / name, pages[start:start + limit], site_url)
+            files.append(name)
+        _write_sitemap_index(dest / "sitemap.xml", files[:], site_url)
+        files.insert(0, "sitemap.xml")
+    for stale in dest.glob("sitemap-*.xml"):
+        if stale.name not in files:
+            stale.unlink()
+    return files
+
+
+def _write_urlset(path, pages, site_url):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<urlset xmlns="{SITEMAP_NS}">\n')
+        for page in pages:
+            out.write(f"<url><loc>{escape(absolute_url(site_url, page.path))}</loc>")
+            if page.date:
+                out.write(f"<lastmod>{escape(page.date)}</lastmod>")
+            out.write("</url>\n")
+        out.write("</urlset>\n")
+
+
+def _write_sitemap_index(path, names, site_url):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+        for name in names:
+            loc = absolute_url(site_url, f"/{name}")
+            out.write(f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n")
+        out.write("</sitemapindex>\n")
+
+
+def write_atom_feed(pages, path, site_url, title, limit=FEED_ENTRY_LIMIT, author=None):
+    entries = sorted((page for page in pages if page.date),
+                     key=lambda page: (page.date, page.path), reverse=True)[:limit]
+    if not entries:
+        return False
+    feed_url = absolute_url(site_url, "/")
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<feed xmlns="{ATOM_NS}">\n')
+        out.write(f"<title>{escape(title)}</title>\n")
+        out.write(f"<id>{escape(feed_url)}</id>\n")
+        out.write(f'<link href="{escape(feed_url)}"/>\n')
+        self_url = absolute_url(site_url, "/" + Path(path).name)
+        out.write(f'<link rel="self" href="{escape(self_url)}"/>\n')
+        # Atom requires an author for the feed when entries have none
+        out.write(f"<author><name>{escape(author or title)}</name></author>\n")
+        out.write(f"<updated>{escape(atom_date(entries[0].date))}</updated>\n")
+        for page in entries:
+            url = escape(absolute_url(site_url, page.path))
+            out.write("<entry>")
+            out.write(f"<title>{escape(page.title)}</title>")
+            out.write(f'<link href="{url}"/><id>{url}</id>')
+            out.write(f"<updated>{escape(atom_date(page.date))}</updated>")
+            for tag in page.tags:
+                out.write(f'<category term="{escape(tag)}"/>')
+            out.write("</entry>\n")
+        out.write("</feed>\n")
+    return True
+
+
+def read_feeds_stamp(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_feeds(index, dest_dir, site_url, title, force=False, stamp=None):
+    # stamp records the site url and title the feeds were last written
+    # with; every url in them changes with either
+    dest = Path(dest_dir)
+    settings = {"site_url": site_url, "title": title}
+    if (not force and index.feeds_generation == index.generation
+            and (dest / "sitemap.xml").is_file()
+            and (stamp is None or read_feeds_stamp(stamp) == settings)):
+        return False
+    pages = list(index)
+    write_sitemap(pages, dest, site_url)
+    if not write_atom_feed(pages, dest / "atom.xml", site_url, title):
+        (dest / "atom.xml").unlink(missing_ok=True)
+    if stamp is not None:
+        Path(stamp).parent.mkdir(parents=True, exist_ok=True)
+        Path(stamp).write_text(json.dumps(settings))
+    index.feeds_generation = index.generation
+    return True
@@ -0,0 +1,165 @@
+from array import array
+from htmlnode import CLOSE_TAGS, OPEN_TAGS, LeafNode, ParentNode, escape_text, serialize_props
+
+# Opcodes of the flat event stream; RAW is a leaf whose text is already
+# escaped markup
+OPEN = 0
+CLOSE = 1
+LEAF = 2
+RAW = 3
+
+
+class FlatDocument:
+    def __init__(self):
+        # One entry per event in four parallel arrays. Tag id 0 is "no tag",
+        # props index 0 is "no props"; text is an index into self.strings.
+        self.opcodes = array("B")
+        self.tag_ids = array("H")
+        self.text_offsets = array("I")
+        self.props_indexes = array("I")
+        self.tags = [None]
+        self.strings = []
+        self.props = [None]
+        self._tag_lookup = {None: 0}
+        self._open = []
+        self._root = None
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def _tag_id(self, tag):
+        tag_id = self._tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self.tags.append(tag)
+            self._tag_lookup[tag] = tag_id
+        return tag_id
+
+    def _props_index(self, props):
+        if not props:
+            return 0
+        self.props.append(props)
+        return len(self.props) - 1
+
+    def _emit(self, opcode, tag_id, text_offset, props_index):
+        self.opcodes.append(opcode)
+        self.tag_ids.append(tag_id)
+        self.text_offsets.append(text_offset)
+        self.props_indexes.append(props_index)
+        self._root = None
+
+    # open, close and leaf run once per event, so they write the arrays
+    # themselves rather than through _emit and _tag_id
+
+    def open(self, tag, props=None):
+        if not tag:
+            raise ValueError("Tag is missing")
+        tag_id = self._tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_id(tag)
+        self._open.append((tag_id, len(self.opcodes)))
+        self.opcodes.append(OPEN)
+        self.tag_ids.append(tag_id)
+        self.text_offsets.append(0)
+        self.props_indexes.append(self._props_index(props) if props else 0)
+        self._root = None
+
+    def close(self):
+        tag_id, position = self._open.pop()
+        opcodes = self.opcodes
+        if position == len(opcodes) - 1:
+            raise ValueError("Children are missing")
+        opcodes.append(CLOSE)
+        self.tag_ids.append(tag_id)
+        self.text_offsets.append(0)
+        self.props_indexes.append(0)
+
+    def leaf(self, tag, value, props=None, safe=False):
+        if not value and not props:
+            raise ValueError
+        tag_id = self._tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_id(tag)
+        strings = self.strings
+        self.opcodes.append(RAW if safe else LEAF)
+        self.tag_ids.append(tag_id)
+        self.text_offsets.append(len(strings))
+        strings.append(value)
+        self.props_indexes.append(self._props_index(props) if props else 0)
+        self._root = None
+
+    def append_node(self, node):
+        # Flattens an HTMLNode tree without recursion, mirroring to_html
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is CLOSE:
+                self.close()
+            elif type(node) is ParentNode:
+                if not node.children:
+                    raise ValueError("Children are missing")
+                self.open(node.tag, node.props)
+                stack.append(CLOSE)
+                stack.extend(reversed(node.children))
+            elif type(node) is LeafNode:
+                self.leaf(node.tag, node.value, node.props, node.safe)
+            else:
+                self.strings.append(node.to_html())
+                self._emit(RAW, 0, len(self.strings) - 1, 0)
+
+    def to_html(self):
+        if self._open:
+            raise ValueError(f"Unclosed tag {self.tags[self._open[-1][0]]}")
+        tags = self.tags
+        opens = [""] + [OPEN_TAGS[tag] for tag in tags[1:]]
+        closes = [""] + [CLOSE_TAGS[tag] for tag in tags[1:]]
+        strings = self.strings
+        props_html = [serialize_props(props) for props in self.props]
+        parts = []
+        append = parts.append
+        for opcode, tag_id, text_offset, props_index in zip(
+                self.opcodes, self.tag_ids, self.text_offsets, self.props_indexes):
+            if opcode == OPEN:
+                append(f"<{tags[tag_id]}{props_html[props_index]}>" if props_index
+                       else opens[tag_id])
+            elif opcode == CLOSE:
+                append(closes[tag_id])
+            else:
+                text = strings[text_offset]
+                if opcode == LEAF:
+                    text = escape_text(text)
+                if tag_id == 0:
+                    append(text)
+                elif props_index:
+                    append(f"<{tags[tag_id]}{props_html[props_index]}>{text}{closes[tag_id]}")
+                else:
+                    append(f"{opens[tag_id]}{text}{closes[tag_id]}")
+        return "".join(parts)
+
+    @property
+    def root(self):
+        # Lazy HTMLNode view for code that still expects a node tree
+        if self._root is None:
+            self._root = self.to_node()
+        return self._root
+
+    def to_node(self):
+        if self._open:
+            raise ValueError(f"Unclosed tag {self.tags[self._open[-1][0]]}")
+        top = ParentNode(None, [])
+        stack = [top]
+        for opcode, tag_id, text_offset, props_index in zip(
+                self.opcodes, self.tag_ids, self.text_offsets, self.props_indexes):
+            if opcode == OPEN:
+                node = ParentNode(self.tags[tag_id], [], self.props[props_index])
+                stack[-1].children.append(node)
+                stack.append(node)
+            elif opcode == CLOSE:
+                stack.pop()
+            else:
+                stack[-1].children.append(LeafNode(
+                    self.tags[tag_id], self.strings[text_offset],
+                    self.props[props_index], opcode == RAW))
+        if len(top.children) == 1:
+            return top.children[0]
+        return top
@@ -0,0 +1,62 @@
+class FragmentTable:
+    # One shared value per key for everything in this process, with a
+    # reference count per entry: add() and get() take a reference,
+    # release() drops one and forgets the entry with its last holder
+    def __init__(self, limit=None):
+        self.entries = {}
+        self.limit = limit
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def clear(self):
+        self.entries.clear()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry[1] += 1
+        return entry[0]
+
+    def add(self, key, value):
+        if self.limit is not None and len(self.entries) >= self.limit:
+            self.evict()
+        self.entries[key] = [value, 1]
+        return value
+
+    def intern(self, text):
+        shared = self.get(text)
+        if shared is None:
+            shared = self.add(text, text)
+        return shared
+
+    def release(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.entries[key]
+
+    def refs(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else 0
+
+    def evict(self):
+        # Keep what more than one holder shared; if that alone fills the
+        # table, start over like the other memo tables
+        self.entries = {key: entry for key, entry in self.entries.items() if entry[1] > 1}
+        if len(self.entries) >= self.limit:
+            self.entries.clear()
+
+    def top(self, n=10):
+        # (key, refs) for the entries whose sharing saved the most
+        # characters
+        ranked = sorted(self.entries.items(),
+                        key=lambda item: (item[1][1] - 1) * len(str(item[0])),
+                        reverse=True)
+        return [(key, entry[1]) for key, entry in ranked[:n] if entry[1] > 1]
@@ -0,0 +1,83 @@
+import re
+
+from htmlnode import escape_text
+
+PYTHON_KEYWORDS = (
+    "False None True and as assert async await break class continue def del elif else "
+    "except finally for from global if import in is lambda nonlocal not or pass raise "
+    "return try while with yield match case"
+).split()
+SHELL_KEYWORDS = (
+    "if then else elif fi for while until do done case esac in function return "
+    "local export set unset source exit"
+).split()
+
+# Token patterns per language; they are compiled on first use so pages
+# without code don't pay for them
+LEXERS = {
+    "python": ("|".join((
+        r"(?P<comment>#[^\n]*)",
+        r"(?P<string>[rbfuRBFU]{0,2}(?:'''[\s\S]*?'''|\"\"\"[\s\S]*?\"\"\""
+        r"|'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"))",
+        r"(?P<decorator>^[ \t]*@[\w.]+)",
+        rf"(?P<keyword>\b(?:{'|'.join(PYTHON_KEYWORDS)})\b)",
+        r"(?P<number>\b\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?j?\b)",
+    )), re.M),
+    "shell": ("|".join((
+        r"(?P<comment>(?<!\S)#[^\n]*)",
+        r"(?P<string>'[^']*'|\"(?:\\.|[^\"\\])*\")",
+        r"(?P<variable>\$(?:\{[^}\n]*\}|\w+|[@*#?$!]))",
+        rf"(?P<keyword>(?<![\w-])(?:{'|'.join(SHELL_KEYWORDS)})(?![\w-]))",
+    )), 0),
+    "json": ("|".join((
+        r"(?P<key>\"(?:\\.|[^\"\\])*\"(?=\s*:))",
+        r"(?P<string>\"(?:\\.|[^\"\\])*\")",
+        r"(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)",
+        r"(?P<literal>\b(?:true|false|null)\b)",
+    )), 0),
+}
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "sh": "shell",
+    "bash": "shell",
+    "console": "shell",
+}
+HIGHLIGHT_CACHE_LIMIT = 1024
+
+_highlighted = {}
+
+
+def language_name(info):
+    # The first word of a fence's info string, e.g. "python" in ```python
+    language = info.strip().split(" ", 1)[0].lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def tokens_to_html(pattern, code):
+    parts = []
+    append = parts.append
+    position = 0
+    for match in pattern.finditer(code):
+        start = match.start()
+        if start > position:
+            append(escape_text(code[position:start]))
+        append(f'<span class="tok-{match.lastgroup}">{escape_text(match[0])}</span>')
+        position = match.end()
+    append(escape_text(code[position:]))
+    return "".join(parts)
+
+
+def highlight(code, language):
+    # Returns the escaped, highlighted markup, or None for languages without
+    # a lexer. Results are memoized so a snippet repeated across pages is
+    # only tokenized once per process.
+    if language not in LEXERS:
+        return None
+    key = (language, code)
+    html = _highlighted.get(key)
+    if html is None:
+        if len(_highlighted) >= HIGHLIGHT_CACHE_LIMIT:
+            _highlighted.clear()
+        html = _highlighted[key] = tokens_to_html(re.compile(*LEXERS[language]), code)
+    return html
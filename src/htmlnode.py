@@ -1,20 +1,100 @@
+def needs_escape(text):
+    return "&" in text or "<" in text or ">" in text
+
+
+def escape_text(text):
+    # Most text has nothing to escape; three substring scans are much
+    # cheaper than building a new string
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def escape_attr(value):
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return (value.replace("&", "&amp;").replace("<", "&lt;")
+                .replace(">", "&gt;").replace('"', "&quot;"))
+    return value
+
+
+class TagTable(dict):
+    # Formatted tag strings, built once per tag name and then shared
+    def __init__(self, template, tags):
+        super().__init__((tag, template.format(tag)) for tag in tags)
+        self.template = template
+
+    def __missing__(self, tag):
+        value = self[tag] = self.template.format(tag)
+        return value
+
+
+KNOWN_TAGS = ("div", "p", "span", "b", "i", "em", "strong", "code", "pre", "a", "img",
+              "ul", "ol", "li", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6",
+              "table", "thead", "tbody", "tr", "th", "td")
+OPEN_TAGS = TagTable("<{}>", KNOWN_TAGS)
+CLOSE_TAGS = TagTable("</{}>", KNOWN_TAGS)
+FROZEN_PROPS_LIMIT = 4096
+
+
+def serialize_props(props):
+    if not props:
+        return ""
+    if type(props) is FrozenProps:
+        return props.html
+    result = ""
+    for prop in props:
+        result += f" {prop}=\"{escape_attr(str(props[prop]))}\""
+    return result
+
+
+class FrozenProps(dict):
+    # An immutable props dict that serializes itself once
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.html = serialize_props(dict(self))
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("FrozenProps is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(tuple(self.items()))
+
+    def __reduce__(self):
+        return FrozenProps, (dict(self),)
+
+
+_frozen_props = {}
+
+
+def freeze_props(props):
+    # Shares one FrozenProps per distinct props dict, e.g. every page's
+    # "back home" link
+    key = tuple(props.items())
+    frozen = _frozen_props.get(key)
+    if frozen is None:
+        if len(_frozen_props) >= FROZEN_PROPS_LIMIT:
+            _frozen_props.clear()
+        frozen = _frozen_props[key] = FrozenProps(props)
+    return frozen
+
+
 class HTMLNode:
-    def __init__(self, tag=None, value=None, children=None, props=None):
+    def __init__(self, tag=None, value=None, children=None, props=None, safe=False):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+        # Safe nodes hold markup that is already escaped
+        self.safe = safe
 
     def to_html(self):
         raise NotImplementedError
 
     def props_to_html(self):
-        if not self.props:
-            return ""
-        result = ""
-        for prop in self.props:
-            result += f" {prop}=\"{self.props[prop]}\""
-        return result
+        return serialize_props(self.props)
 
     def __repr__(self):
         children = self.children if self.children is not None else []
@@ -23,16 +103,19 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
-    def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+    def __init__(self, tag, value, props=None, safe=False):
+        super().__init__(tag, value, None, props, safe)
 
     def to_html(self):
         if not self.value and not self.props:
-            print(f"Problem in {self}")
-            raise ValueError
-        if not self.tag:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            raise ValueError(f"Leaf node without a value: {self!r}")
+        value = self.value if self.safe else escape_text(self.value)
+        tag = self.tag
+        if not tag:
+            return value
+        if self.props:
+            return f"<{tag}{self.props_to_html()}>{value}</{tag}>"
+        return f"{OPEN_TAGS[tag]}{value}{CLOSE_TAGS[tag]}"
 
 
 class ParentNode(HTMLNode):
@@ -44,7 +127,80 @@ class ParentNode(HTMLNode):
             raise ValueError("Tag is missing")
         if not self.children:
             raise ValueError("Children are missing")
-        result = ""
-        for child in self.children:
-            result += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{result}</{self.tag}>"
+        # Walk with an explicit stack of (children iterator, closing tag)
+        # frames so deep trees can't hit the recursion limit
+        parts = [f"<{self.tag}{self.props_to_html()}>" if self.props else OPEN_TAGS[self.tag]]
+        append = parts.append
+        stack = []
+        children = iter(self.children)
+        close = CLOSE_TAGS[self.tag]
+        while True:
+            for child in children:
+                if type(child) is ParentNode:
+                    if not child.tag:
+                        raise ValueError("Tag is missing")
+                    if not child.children:
+                        raise ValueError("Children are missing")
+                    if child.props:
+                        append(f"<{child.tag}{child.props_to_html()}>")
+                    else:
+                        append(OPEN_TAGS[child.tag])
+                    stack.append((children, close))
+                    children = iter(child.children)
+                    close = CLOSE_TAGS[child.tag]
+                    break
+                append(child.to_html())
+            else:
+                append(close)
+                if not stack:
+                    return "".join(parts)
+                children, close = stack.pop()
+
+
+class TableNode(HTMLNode):
+    # A whole table in one node: cells are plain strings, or lists of
+    # inline nodes for cells with markup, and are serialized straight into
+    # <td>/<th> strings instead of through a ParentNode per cell and row
+    def __init__(self, header, rows, alignments=None, safe=False):
+        super().__init__("table", None, None, None, safe)
+        self.header = header
+        self.rows = rows
+        self.alignments = alignments or [None] * len(header)
+
+    def _cell_tags(self, tag):
+        opens = []
+        for alignment in self.alignments:
+            if alignment:
+                opens.append(f'<{tag} style="text-align: {alignment}">')
+            else:
+                opens.append(OPEN_TAGS[tag])
+        return opens
+
+    def _append_row(self, append, cells, opens, close):
+        append("<tr>")
+        for cell, open_tag in zip(cells, opens):
+            append(open_tag)
+            if type(cell) is str:
+                append(cell if self.safe else escape_text(cell))
+            else:
+                for node in cell:
+                    append(node.to_html())
+            append(close)
+        append("</tr>")
+
+    def to_html(self):
+        parts = ["<table><thead>"]
+        append = parts.append
+        self._append_row(append, self.header, self._cell_tags("th"), "</th>")
+        append("</thead>")
+        if self.rows:
+            append("<tbody>")
+            opens = self._cell_tags("td")
+            for row in self.rows:
+                self._append_row(append, row, opens, "</td>")
+            append("</tbody>")
+        append("</table>")
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"TableNode(header={self.header!r}, rows={len(self.rows)})"
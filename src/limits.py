@@ -0,0 +1,69 @@
+import math
+import signal
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # No rlimits on this platform; pages then render without limits
+    resource = None
+
+
+class PageTimeout(Exception):
+    pass
+
+
+_limited = False
+
+
+def _cpu_exceeded(signum, frame):
+    # The kernel keeps sending SIGXCPU once a while past the soft limit, so
+    # it is only an error while a page is being limited
+    if _limited:
+        raise PageTimeout("CPU time limit exceeded")
+
+
+def _lower_soft_limit(which, soft):
+    current, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(which, (soft, hard))
+    return current, hard
+
+
+def _address_space():
+    # The process's current virtual size, so a worker forked from a parent
+    # with a lot mapped (the daemon's warm caches) still gets its budget
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@contextmanager
+def page_limits(cpu_seconds=None, memory_bytes=None):
+    # Soft limits only: a process may raise its soft limit back afterwards
+    # but could never raise a lowered hard one, and the worker goes on to
+    # render other pages. Python handles SIGXCPU between bytecodes, so a
+    # page stuck in one long C call (a regex, say) only stops after it.
+    global _limited
+    if resource is None or not (cpu_seconds or memory_bytes):
+        yield
+        return
+    saved = []
+    try:
+        if cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            signal.signal(signal.SIGXCPU, _cpu_exceeded)
+            limit = math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds)
+            saved.append((resource.RLIMIT_CPU, _lower_soft_limit(resource.RLIMIT_CPU, limit)))
+        if memory_bytes:
+            limit = _address_space() + memory_bytes
+            saved.append((resource.RLIMIT_AS, _lower_soft_limit(resource.RLIMIT_AS, limit)))
+        _limited = True
+        yield
+    finally:
+        _limited = False
+        for which, limits in reversed(saved):
+            resource.setrlimit(which, limits)
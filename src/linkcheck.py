@@ -0,0 +1,122 @@
+import json
+import posixpath
+from pathlib import Path
+from textnode import TextType
+from fragments import FragmentTable
+
+EXTERNAL_PREFIXES = ("http://", "https://", "//", "mailto:", "tel:", "data:")
+
+
+def canonical_path(path):
+    if path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return path.rstrip("/") or "/"
+
+
+def link_target(page_url, url):
+    # Returns the canonical site path a link points to, or None for links
+    # this checker doesn't own (external, fragment-only)
+    if not url or url.startswith("#") or url.startswith(EXTERNAL_PREFIXES):
+        return None
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if not path:
+        return None
+    if not path.startswith("/"):
+        base = page_url if page_url.endswith("/") else posixpath.dirname(page_url).rstrip("/") + "/"
+        path = posixpath.normpath(base + path)
+    return canonical_path(path)
+
+
+class BrokenLink:
+    def __init__(self, source, line, kind, url):
+        self.source = source
+        self.line = line
+        self.kind = kind
+        self.url = url
+
+    def __eq__(self, value):
+        return (self.source, self.line, self.kind, self.url) == (
+            value.source, value.line, value.kind, value.url)
+
+    def __repr__(self):
+        return f"{self.source}:{self.line}: broken {self.kind} {self.url}"
+
+
+class LinkChecker:
+    def __init__(self, pages=None):
+        # page url -> {"source", "hash", "links": [[kind, url], ...]}
+        self.pages = pages if pages is not None else {}
+        # Link urls like "/" repeat on most pages; each is stored once
+        self.urls = FragmentTable()
+        for page in self.pages.values():
+            page["links"] = self._intern_links(page["links"])
+
+    @classmethod
+    def load(cls, path):
+        p = Path(path)
+        if not p.is_file():
+            return cls()
+        try:
+            return cls(json.loads(p.read_text()).get("pages", {}))
+        except ValueError:
+            return cls()
+
+    def save(self, path):
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps({"pages": self.pages}, separators=(",", ":")))
+
+    def update(self, page_url, source, hash, links):
+        self._release(page_url)
+        self.pages[page_url] = {"source": str(source), "hash": hash,
+                                "links": self._intern_links(links)}
+
+    def retain(self, page_urls):
+        keep = set(page_urls)
+        for page_url in list(self.pages):
+            if page_url not in keep:
+                self._release(page_url)
+                del self.pages[page_url]
+
+    def _intern_links(self, links):
+        return [[kind, self.urls.intern(url)] for kind, url in links]
+
+    def _release(self, page_url):
+        page = self.pages.get(page_url)
+        if page is not None:
+            for _, url in page["links"]:
+                self.urls.release(url)
+
+    def check(self, targets):
+        known = {canonical_path(target) for target in targets}
+        broken = []
+        for page_url in sorted(self.pages):
+            page = self.pages[page_url]
+            for kind, url in page["links"]:
+                target = link_target(page_url, url)
+                if target is not None and target not in known:
+                    broken.append((page, kind, url))
+        return [BrokenLink(page["source"], find_line(page["source"], url), kind, url)
+                for page, kind, url in broken]
+
+
+def collect_links(text_nodes, links):
+    for node in text_nodes:
+        if node.text_type == TextType.LINK:
+            links.append(("link", node.url))
+        elif node.text_type == TextType.IMAGE:
+            links.append(("image", node.url))
+    return links
+
+
+def find_line(source, url):
+    # Only runs for broken links, so re-reading the source here is cheap
+    try:
+        lines = Path(source).read_text().split("\n")
+    except OSError:
+        return 0
+    needle = f"]({url})"
+    for number, line in enumerate(lines, 1):
+        if needle in line:
+            return number
+    return 0
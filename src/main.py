@@ -1,205 +1,208 @@
-from pathlib import Path
-import shutil
 import sys
-from blocknode import BlockType, block_to_block_type
-from markdown_parser import markdown_to_blocks, text_to_textnodes
-from textnode import TextNode, TextType
-from htmlnode import HTMLNode, LeafNode, ParentNode
-
-
-def main():
-    basepath = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else "."
-    copy_static()
-    generate_pages(f"./content",
-                   f"./template.html", f"./docs")
-    # print(f"{None}")
-
-
-def text_node_to_html_node(text_node):
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(None, text_node.text)
-        case TextType.BOLD:
-            return LeafNode("b", text_node.text)
-        case TextType.ITALIC:
-            return LeafNode("i", text_node.text)
-        case TextType.CODE:
-            return LeafNode("code", text_node.text)
-        case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
-        case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-        case _:
-            raise Exception(f"Invalid TextType {text_node.text_type}")
-
-
-def text_nodes_to_html_nodes(text_nodes):
-    result = []
-    for text_node in text_nodes:
-        node = text_node_to_html_node(text_node)
-        result.append(node)
+import time
+from pathlib import Path
+from markdown_parser import split_front_matter
+from metadata import PageMeta, content_hash
+from search import count_terms
+from linkcheck import collect_links
+from urls import resolve_template_urls
+from outputs import write_chunks_if_changed, write_if_changed
+from render import (Outline, extract_title, iter_markdown_html, markdown_outline,
+                    markdown_to_flat_document, markdown_to_html_node)
+
+# Pages whose markdown is at least this many characters are rendered and
+# written one section at a time
+CHUNKED_PAGE_SIZE = 1 << 20
+
+
+def main(argv=None):
+    from build import build, parse_args
+    graph = build(parse_args(argv))
+    return 1 if graph.failures else 0
+
+
+def page_url(relative_path):
+    parts = Path(relative_path).parts
+    if parts and parts[-1] == "index.html":
+        parts = parts[:-1]
+        return "/" + "".join(f"{part}/" for part in parts)
+    return "/" + "/".join(parts)
+
+
+def page_meta(front_matter, title, url, digest):
+    tags = front_matter.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tags]
+    return PageMeta(url, title, front_matter.get("date"), tags, digest)
+
+
+class PageResult:
+    def __init__(self, meta, source, terms, links, written=True, size=0, cache_hits=0,
+                 timings=None):
+        self.meta = meta
+        self.source = source
+        self.terms = terms
+        self.links = links
+        # False when the page on disk was already identical
+        self.written = written
+        # Bytes of html on disk, blocks served by the render cache and the
+        # seconds spent in each stage, for the event log
+        self.size = size
+        self.cache_hits = cache_hits
+        self.timings = timings if timings is not None else {}
+
+    def __repr__(self):
+        return f"PageResult({self.meta.path}, {self.source})"
+
+
+class PageError(Exception):
+    # A page that could not be rendered: which stage it failed in and how
+    # long it had been running. Plain strings only, so it pickles back from
+    # a worker process
+    def __init__(self, source, stage, elapsed, message):
+        super().__init__(source, stage, elapsed, message)
+        self.source = source
+        self.stage = stage
+        self.elapsed = elapsed
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source}: failed in {self.stage} after {self.elapsed:.2f}s: {self.message}"
+
+
+class PageStages:
+    # The stages a page has gone through and when each one started
+    def __init__(self):
+        self.names = []
+        self.starts = []
+        self.enter("read")
+
+    def enter(self, name):
+        self.names.append(name)
+        self.starts.append(time.perf_counter())
+
+    @property
+    def current(self):
+        return self.names[-1]
+
+    def elapsed(self):
+        return time.perf_counter() - self.starts[0]
+
+    def timings(self):
+        ends = self.starts[1:] + [time.perf_counter()]
+        return {name: round(end - start, 6)
+                for name, start, end in zip(self.names, self.starts, ends)}
+
+
+def render_page(from_path, template_path, dest_path, url=None, resolve_url=None, cache=None,
+                flat=False):
+    stages = PageStages()
+    try:
+        result = _render_page(from_path, template_path, dest_path, url, resolve_url, cache,
+                              flat, stages)
+    except Exception as error:
+        message = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+        raise PageError(str(from_path), stages.current, stages.elapsed(), message) from error
+    result.timings = stages.timings()
     return result
 
 
-def markdown_to_html_node(markdown):
-    root = ParentNode("div", [])
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.HEADING:
-                line = block
-                count = 0
-                for char in line:
-                    if char == '#':
-                        count += 1
-                    else:
-                        break
-                text = line[count+1:]
-                text_nodes = text_to_textnodes(text)
-                html_nodes = text_nodes_to_html_nodes(text_nodes)
-                node = ParentNode(f"h{count}", html_nodes)
-                root.children.append(node)
-
-            case BlockType.QUOTE:
-                node = ParentNode('blockquote', [])
-                lines = block.split('\n')
-                stripped = []
-                for line in lines:
-                    stripped.append(line.removeprefix('> '))
-
-                text_nodes = text_to_textnodes("\n".join(stripped))
-                html_nodes = text_nodes_to_html_nodes(text_nodes)
-                node.children.extend(html_nodes)
-                root.children.append(node)
-
-            case BlockType.ORDERED_LIST:
-                node = ParentNode('ol', [])
-                lines = block.split('\n')
-                for line in lines:
-                    stripped = line[3:]
-                    text_nodes = text_to_textnodes(stripped)
-                    html_nodes = text_nodes_to_html_nodes(text_nodes)
-                    html_node = ParentNode('li', html_nodes)
-                    node.children.append(html_node)
-                root.children.append(node)
-
-            case BlockType.UNORDERED_LIST:
-                node = ParentNode('ul', [])
-                lines = block.split('\n')
-                for line in lines:
-                    stripped = line.removeprefix('- ')
-                    text_nodes = text_to_textnodes(stripped)
-                    html_nodes = text_nodes_to_html_nodes(text_nodes)
-                    html_node = ParentNode('li', html_nodes)
-                    node.children.append(html_node)
-                root.children.append(node)
-
-            case BlockType.CODE:
-                lines = block.split('\n')
-                stripped_lines = lines[1:-1]
-                text = "\n".join(stripped_lines) + "\n"
-                text_node = TextNode(text, TextType.TEXT)
-                html_node = text_node_to_html_node(text_node)
-                node = ParentNode('pre', [ParentNode("code", [html_node])])
-                root.children.append(node)
-
-            case BlockType.PARAGRAPH:
-                lines = block.split('\n')
-                line = " ".join(lines)
-                node = ParentNode('p', [])
-
-                text_nodes = text_to_textnodes(line)
-                html_nodes = text_nodes_to_html_nodes(text_nodes)
-                node.children.extend(html_nodes)
-
-                root.children.append(node)
-            case _:
-                text_nodes = text_to_textnodes(block)
-                html_nodes = text_nodes_to_html_nodes(text_nodes)
-                node = ParentNode('div', html_nodes)
-                root.children.append(node)
-
-    return root
-
-
-def extract_title(markdown):
-    blocks = markdown.split("\n\n")
-    maybe_title = blocks[0]
-    if not maybe_title.startswith("# "):
-        raise Exception("Invalid Title")
-    title = maybe_title.removeprefix("# ")
-    stripped = title.strip()
-    return stripped
-
-
-def copy_static():
-    clear_dir("./docs")
-    copy_dir_contents('./static', './docs')
-
-
-def clear_dir(path: str | Path) -> None:
-    print(Path(path).resolve())
-    p = Path(path)
-    if not p.is_dir():
-        raise ValueError(f"{p} is not a directory")
-
-    for item in p.iterdir():
-        if item.is_dir():
-            shutil.rmtree(item)
-        else:
-            item.unlink()
-
-
-def generate_page(from_path, template_path, dest_path):
+def _render_page(from_path, template_path, dest_path, url, resolve_url, cache, flat, stages):
     src = Path(from_path)
     dest = Path(dest_path)
     template = Path(template_path)
-    basepath = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else "."
-    # print(
-    #     f"Generating page from {src.resolve()} to {dest.resolve()} using {template.resolve()}")
     markdown = src.read_text()
-    template_file = template.read_text()
-    title = extract_title(markdown)
+    hits = cache.hits if cache is not None else 0
+    if cache is not None:
+        template_file = cache.template(template)
+    else:
+        template_file = template.read_text()
+        if resolve_url is not None:
+            template_file = resolve_template_urls(template_file, resolve_url)
+    stages.enter("front matter")
+    front_matter, body = split_front_matter(markdown)
+    title = front_matter.get("title") or extract_title(body)
     template_file = template_file.replace("{{ Title }}", title)
-    content = markdown_to_html_node(markdown)
-    # print(f"content {template_file}")
-    content_string = content.to_html()
-    template_file = template_file.replace("{{ Content }}", content_string)
-    template_file = template_file.replace("href=\"/", f"href=\"{basepath}/")
-    template_file = template_file.replace("src=\"/", f"src=\"{basepath}/")
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_text(template_file)
-
-
-def generate_pages(dir_path_content, template_path, dest_dir_path):
+    terms = {}
+    links = []
+
+    def on_text_nodes(text_nodes):
+        count_terms(text_nodes, terms)
+        collect_links(text_nodes, links)
+
+    outline = Outline()
+    if len(body) >= CHUNKED_PAGE_SIZE:
+        # Parsing, rendering and writing are interleaved section by section
+        stages.enter("stream")
+        prefix, _, suffix = template_file.partition("{{ Content }}")
+        if "{{ Toc }}" in prefix:
+            # Written before any section is rendered, so the outline needs
+            # its own pass over the headings
+            prefix = prefix.replace("{{ Toc }}", markdown_outline(body).to_html())
+
+        def page_chunks():
+            yield prefix
+            # Without the cache: it would keep every block of the page, and
+            # memory would no longer be bounded by one section
+            yield from iter_markdown_html(body, on_text_nodes, resolve_url, None, outline)
+            yield suffix.replace("{{ Toc }}", outline.to_html())
+
+        written = write_chunks_if_changed(dest, page_chunks())
+    else:
+        stages.enter("parse")
+        if flat:
+            # Same output with less held per page; rendered blocks are not
+            # cached in this mode
+            content = markdown_to_flat_document(body, on_text_nodes, resolve_url, outline)
+        else:
+            content = markdown_to_html_node(body, on_text_nodes, resolve_url, cache, outline)
+        stages.enter("render")
+        content_string = content.to_html()
+        template_file = template_file.replace("{{ Toc }}", outline.to_html())
+        template_file = template_file.replace("{{ Content }}", content_string)
+        stages.enter("write")
+        written = write_if_changed(dest, template_file)
+    stages.enter("index")
+    meta = page_meta(front_matter, title, url or page_url(dest.name),
+                     content_hash(markdown))
+    cache_hits = cache.hits - hits if cache is not None else 0
+    return PageResult(meta, str(src), terms, links, written, dest.stat().st_size, cache_hits)
+
+
+def record_page(result, index=None, search_index=None, link_checker=None):
+    meta = result.meta
+    if index is not None:
+        index.update(meta)
+    if search_index is not None:
+        search_index.update(meta.path, meta.title, result.terms)
+    if link_checker is not None:
+        link_checker.update(meta.path, result.source, meta.hash, result.links)
+    return meta
+
+
+def generate_page(from_path, template_path, dest_path, index=None, url=None, search_index=None, link_checker=None, resolve_url=None):
+    result = render_page(from_path, template_path, dest_path, url, resolve_url)
+    return record_page(result, index, search_index, link_checker)
+
+
+def generate_pages(dir_path_content, template_path, dest_dir_path, index=None, url_prefix="/", search_index=None, link_checker=None, resolve_url=None):
     src = Path(dir_path_content)
     dest = Path(dest_dir_path)
     template = Path(template_path)
+    pages = []
     for item in src.iterdir():
         if item.is_dir():
-            generate_pages(item, template_path, dest / item.name)
-        else:
-            generate_page(item, template_path, dest /
-                          item.relative_to(src).with_suffix('.html'))
-
-
-def copy_dir_contents(src: str | Path, dst: str | Path) -> None:
-    src = Path(src)
-    print(f"src{src.resolve()}")
-    dst = Path(dst)
-    print(f"dst{dst.resolve()}")
-
-    if not src.is_dir():
-        raise ValueError(f"{src} is not a directory")
-    dst.mkdir(parents=True, exist_ok=True)
-
-    for item in src.iterdir():
-        target = dst / item.name
-        if item.is_dir():
-            shutil.copytree(item, target, dirs_exist_ok=True)
+            pages.extend(generate_pages(item, template_path, dest / item.name,
+                                        index, f"{url_prefix}{item.name}/",
+                                        search_index, link_checker, resolve_url))
         else:
-            shutil.copy2(item, target)
+            relative = item.relative_to(src).with_suffix('.html')
+            url = url_prefix.rstrip("/") + page_url(relative)
+            pages.append(generate_page(item, template_path, dest / relative,
+                                       index, url, search_index, link_checker,
+                                       resolve_url))
+    return pages
 
 
-main()
+if __name__ == "__main__":
+    sys.exit(main())
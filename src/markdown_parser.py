@@ -1,9 +1,10 @@
 import re
+from blocknode import BlockType, list_item_kind
+from extensions import EXTENSIONS
 from textnode import TextNode, TextType
 
 
-def split_nodes_delimiter(old_nodes, delimiter, text_type):
-    result = []
+def iter_split_nodes_delimiter(old_nodes, delimiter, text_type):
     for old_node in old_nodes:
         blocks = old_node.text.split(delimiter)
         if len(blocks) % 2 == 0:
@@ -12,22 +13,21 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         for block in blocks:
             if block:  # skip empty blocks
                 if count % 2 == 0:
-                    node = TextNode(block, old_node.text_type)
-                    result.append(node)
+                    yield TextNode(block, old_node.text_type)
                 else:
-                    node = TextNode(block, text_type)
-                    result.append(node)
+                    yield TextNode(block, text_type)
             count += 1
 
-    return result
 
+def split_nodes_delimiter(old_nodes, delimiter, text_type):
+    return list(iter_split_nodes_delimiter(old_nodes, delimiter, text_type))
 
-def split_nodes_image(old_nodes):
-    result = []
+
+def iter_split_nodes_image(old_nodes):
     for old_node in old_nodes:
         blocks = extract_markdown_images(old_node.text)
         if len(blocks) == 0:
-            result.append(old_node)
+            yield old_node
             continue
         remainder = old_node.text
         for block in blocks:
@@ -36,22 +36,21 @@ def split_nodes_image(old_nodes):
             sections = remainder.split(f"![{alt_text}]({url})", 1)
             remainder = sections[1]
             if sections[0] != "":
-                new_node = TextNode(sections[0], text_type=TextType.TEXT)
-                result.append(new_node)
-            image_node = TextNode(alt_text, TextType.IMAGE, url)
-            result.append(image_node)
+                yield TextNode(sections[0], text_type=TextType.TEXT)
+            yield TextNode(alt_text, TextType.IMAGE, url)
         if remainder != "":
-            last_node = TextNode(remainder, text_type=TextType.TEXT)
-            result.append(last_node)
-    return result
+            yield TextNode(remainder, text_type=TextType.TEXT)
 
 
-def split_nodes_link(old_nodes):
-    result = []
+def split_nodes_image(old_nodes):
+    return list(iter_split_nodes_image(old_nodes))
+
+
+def iter_split_nodes_link(old_nodes):
     for old_node in old_nodes:
         blocks = extract_markdown_links(old_node.text)
         if len(blocks) == 0:
-            result.append(old_node)
+            yield old_node
             continue
         remainder = old_node.text
         for block in blocks:
@@ -60,36 +59,184 @@ def split_nodes_link(old_nodes):
             sections = remainder.split(f"[{alt_text}]({url})", 1)
             remainder = sections[1]
             if sections[0] != "":
-                new_node = TextNode(sections[0], text_type=TextType.TEXT)
-                result.append(new_node)
-            image_node = TextNode(alt_text, TextType.LINK, url)
-            result.append(image_node)
+                yield TextNode(sections[0], text_type=TextType.TEXT)
+            yield TextNode(alt_text, TextType.LINK, url)
         if remainder != "":
-            last_node = TextNode(remainder, text_type=TextType.TEXT)
-            result.append(last_node)
-    return result
+            yield TextNode(remainder, text_type=TextType.TEXT)
+
+
+def split_nodes_link(old_nodes):
+    return list(iter_split_nodes_link(old_nodes))
+
+
+def iter_split_nodes_extensions(old_nodes):
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT or not EXTENSIONS.has_triggers(old_node.text):
+            yield old_node
+            continue
+        yield from EXTENSIONS.split_inline(old_node.text)
+
+
+def split_nodes_extensions(old_nodes):
+    return list(iter_split_nodes_extensions(old_nodes))
+
+
+def has_inline_markup(text):
+    # Every inline construct needs one of these; "!" only starts an image
+    # together with "["
+    return ("**" in text or "_" in text or "`" in text or "[" in text
+            or EXTENSIONS.trigger_pattern is not None and EXTENSIONS.has_triggers(text))
+
+
+def iter_text_to_textnodes(text):
+    if not has_inline_markup(text):
+        return iter((TextNode(text, TextType.TEXT),) if text else ())
+    # Each stage pulls nodes from the one before, so no stage keeps a list
+    # of the whole paragraph alive
+    nodes = iter_split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD)
+    nodes = iter_split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = iter_split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = iter_split_nodes_image(nodes)
+    nodes = iter_split_nodes_link(nodes)
+    if EXTENSIONS.inlines:
+        nodes = iter_split_nodes_extensions(nodes)
+    return nodes
 
 
 def text_to_textnodes(text):
-    node = TextNode(text, TextType.TEXT)
-    bold = split_nodes_delimiter([node], "**", TextType.BOLD)
-    italic = split_nodes_delimiter(bold, "_", TextType.ITALIC)
-    code = split_nodes_delimiter(italic, "`", TextType.CODE)
-    images = split_nodes_image(code)
-    links = split_nodes_link(images)
-    return links
+    return list(iter_text_to_textnodes(text))
 
 
-def markdown_to_blocks(markdown):
-    result = []
-    blocks = markdown.split("\n\n")
-    for block in blocks:
-        trimmed = block.strip()
-        if trimmed:
-            result.append(trimmed)
+def split_front_matter(markdown):
+    lines = markdown.split("\n")
+    if not lines or lines[0].strip() != "---":
+        return {}, markdown
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            meta = parse_front_matter(lines[1:i])
+            return meta, "\n".join(lines[i + 1:])
+    # An opening fence without a closing one is just a thematic break
+    return {}, markdown
+
+
+def parse_front_matter(lines):
+    result = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None and isinstance(result[key], list):
+            result[key].append(_front_matter_scalar(stripped[2:]))
+            continue
+        if ":" not in stripped:
+            raise ValueError(f"Invalid front matter line: {line}")
+        key, value = stripped.split(":", 1)
+        key = key.strip()
+        value = value.strip()
+        if not value:
+            result[key] = []
+        elif value.startswith("[") and value.endswith("]"):
+            items = value[1:-1].split(",")
+            result[key] = [_front_matter_scalar(item)
+                           for item in items if item.strip()]
+        else:
+            result[key] = _front_matter_scalar(value)
     return result
 
 
+def _front_matter_scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+FENCE_PATTERN = re.compile(r"^ *```", re.M)
+
+
+def iter_chunks(markdown, separator="\n\n"):
+    # markdown.split(separator) without holding every piece at once
+    start = 0
+    while True:
+        end = markdown.find(separator, start)
+        if end == -1:
+            yield markdown[start:]
+            return
+        yield markdown[start:end]
+        start = end + len(separator)
+
+
+TOP_LEVEL_ITEM_PATTERN = re.compile(r"^(?:(-)|\d+\.) ", re.M)
+
+
+def split_list_kinds(block, kind):
+    # (piece, kind) for each run of a list block; an unindented item with
+    # the other kind of marker ends one list and starts the next
+    pieces = []
+    start = 0
+    if "\n" in block:
+        for match in TOP_LEVEL_ITEM_PATTERN.finditer(block):
+            item_kind = BlockType.UNORDERED_LIST if match[1] else BlockType.ORDERED_LIST
+            if item_kind is not kind:
+                if match.start() > start:
+                    pieces.append((block[start:match.start()].rstrip("\n"), kind))
+                start = match.start()
+                kind = item_kind
+    pieces.append((block[start:], kind))
+    return pieces
+
+
+def iter_markdown_blocks(markdown):
+    # A block is only yielded once the next one starts, since lists and
+    # code fences can carry on past blank lines
+    current = None
+    # A list carries on past a blank line while the next chunk is indented
+    # (another paragraph of an item) or starts another item of the same kind
+    list_kind = None
+    # A code fence carries on, blank lines and all, until it is closed
+    in_fence = False
+    for block in iter_chunks(markdown):
+        if in_fence:
+            in_fence = len(FENCE_PATTERN.findall(block)) % 2 == 0
+            current.append(block if in_fence else block.rstrip())
+            continue
+        trimmed = block.strip()
+        if not trimmed:
+            continue
+        if trimmed.startswith("```"):
+            in_fence = len(FENCE_PATTERN.findall(trimmed)) % 2 == 1
+            list_kind = None
+        elif list_kind is not None:
+            raw = block.strip("\n").rstrip()
+            if raw[0] in " \t" or list_item_kind(trimmed) is list_kind:
+                pieces = split_list_kinds(raw, list_kind)
+                current.append(pieces[0][0])
+                for piece, list_kind in pieces[1:]:
+                    yield "\n\n".join(current)
+                    current = [piece]
+                continue
+            list_kind = list_item_kind(trimmed)
+        else:
+            list_kind = list_item_kind(trimmed)
+        if current is not None:
+            yield "\n\n".join(current)
+        if list_kind is None:
+            current = [trimmed]
+            continue
+        pieces = split_list_kinds(trimmed, list_kind)
+        for piece, _ in pieces[:-1]:
+            yield piece
+        current = [pieces[-1][0]]
+        list_kind = pieces[-1][1]
+    if current is not None:
+        yield "\n\n".join(current)
+
+
+def markdown_to_blocks(markdown):
+    return list(iter_markdown_blocks(markdown))
+
+
 def extract_markdown_images(text):
     matches = re.findall(r"!\[([^\]]*)\]\(([^)]*)\)", text)
     return matches
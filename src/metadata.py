@@ -0,0 +1,110 @@
+import hashlib
+import json
+from pathlib import Path
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PageMeta:
+    def __init__(self, path, title, date=None, tags=None, hash=None):
+        self.path = path
+        self.title = title
+        self.date = date
+        self.tags = tags if tags is not None else []
+        self.hash = hash
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "title": self.title,
+            "date": self.date,
+            "tags": self.tags,
+            "hash": self.hash,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["path"], data["title"], data.get("date"),
+                   data.get("tags"), data.get("hash"))
+
+    def __eq__(self, value):
+        return isinstance(value, PageMeta) and self.to_dict() == value.to_dict()
+
+    def __repr__(self):
+        return f"PageMeta({self.path}, {self.title}, {self.date}, {self.tags})"
+
+
+class MetadataIndex:
+    def __init__(self, pages=None):
+        self.pages = {}
+        # changed is "since the last save"; generation counts every change,
+        # so the feeds can tell whether they are behind independently
+        self.changed = False
+        self.generation = 0
+        self.feeds_generation = 0
+        for page in pages or []:
+            self.pages[page.path] = page
+
+    @classmethod
+    def load(cls, path):
+        p = Path(path)
+        if not p.is_file():
+            return cls()
+        try:
+            data = json.loads(p.read_text())
+        except ValueError:
+            # A corrupt index is only a cache; start from scratch
+            return cls()
+        return cls([PageMeta.from_dict(item) for item in data.get("pages", [])])
+
+    def save(self, path):
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        pages = [self.pages[key].to_dict() for key in sorted(self.pages)]
+        p.write_text(json.dumps({"pages": pages}, indent=1))
+        self.changed = False
+
+    def get(self, path):
+        return self.pages.get(path)
+
+    def update(self, page):
+        if self.pages.get(page.path) == page:
+            return False
+        self.pages[page.path] = page
+        self.changed = True
+        self.generation += 1
+        return True
+
+    def retain(self, paths):
+        keep = set(paths)
+        for path in list(self.pages):
+            if path not in keep:
+                del self.pages[path]
+                self.changed = True
+                self.generation += 1
+
+    def by_tag(self, tag):
+        return [page for page in self.by_date() if tag in page.tags]
+
+    def tags(self):
+        result = {}
+        for page in self.pages.values():
+            for tag in page.tags:
+                result[tag] = result.get(tag, 0) + 1
+        return result
+
+    def by_date(self, reverse=True):
+        # Undated pages sort last regardless of direction
+        dated = [page for page in self.pages.values() if page.date]
+        undated = [page for page in self.pages.values() if not page.date]
+        dated.sort(key=lambda page: (page.date, page.path), reverse=reverse)
+        undated.sort(key=lambda page: page.path)
+        return dated + undated
+
+    def __iter__(self):
+        return iter(self.pages.values())
+
+    def __len__(self):
+        return len(self.pages)
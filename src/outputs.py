@@ -0,0 +1,107 @@
+import os
+from pathlib import Path
+
+
+def same_contents(path, data):
+    # A size mismatch settles most changed files without reading them
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def replace_file(path, data):
+    import tempfile
+    # Write next to the target and rename over it, so readers never see a
+    # half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def write_if_changed(path, text):
+    # Returns False when the file already holds exactly this text, leaving
+    # its mtime alone for rsync, CDNs and browsers
+    p = Path(path)
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    if same_contents(p, data):
+        return False
+    replace_file(p, data)
+    return True
+
+
+def write_chunks_if_changed(path, chunks):
+    # write_if_changed for output produced piece by piece: the chunks go
+    # straight to a temp file while being compared against the old file,
+    # so the whole text never has to be in memory
+    import tempfile
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        old = open(p, "rb")
+    except OSError:
+        old = None
+    same = old is not None
+    fd, temp = tempfile.mkstemp(dir=p.parent, prefix=f".{p.name}.")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                out.write(data)
+                if same:
+                    same = old.read(len(data)) == data
+        if same and old.read(1) == b"":
+            os.unlink(temp)
+            return False
+        os.chmod(temp, 0o644)
+        os.replace(temp, p)
+        return True
+    except BaseException:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+    finally:
+        if old is not None:
+            old.close()
+
+
+def copy_if_changed(src, dest):
+    import shutil
+    data = Path(src).read_bytes()
+    p = Path(dest)
+    if same_contents(p, data):
+        return False
+    replace_file(p, data)
+    shutil.copystat(src, p)
+    return True
+
+
+def prune(dest_dir, keep, patterns=()):
+    # Removes files under dest_dir that are neither in keep (posix paths
+    # relative to dest_dir) nor matched by one of patterns, then any
+    # directories left empty
+    import fnmatch
+    root = Path(dest_dir)
+    removed = []
+    if not root.is_dir():
+        return removed
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        directory = Path(dirpath)
+        for name in filenames:
+            relative = (directory / name).relative_to(root).as_posix()
+            if relative in keep or any(fnmatch.fnmatch(relative, pattern) for pattern in patterns):
+                continue
+            (directory / name).unlink()
+            removed.append(relative)
+        if directory != root and not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
@@ -0,0 +1,526 @@
+import re
+from blocknode import LIST_ITEM_PATTERN, BlockType, block_to_block_type, split_table_row
+from markdown_parser import has_inline_markup, iter_markdown_blocks, iter_text_to_textnodes, markdown_to_blocks, text_to_textnodes
+from textnode import TextNode, TextType
+from fragments import FragmentTable
+from extensions import EXTENSIONS, BlockExtension
+from highlight import highlight, language_name
+from htmlnode import LeafNode, ParentNode, TableNode, freeze_props, needs_escape
+
+
+def text_node_to_html_node(text_node, safe=False, resolve_url=None):
+    # safe marks text already known to contain nothing that needs escaping;
+    # resolve_url rewrites link and image urls as the node is built
+    match text_node.text_type:
+        case TextType.TEXT:
+            return LeafNode(None, text_node.text, None, safe)
+        case TextType.BOLD:
+            return LeafNode("b", text_node.text, None, safe)
+        case TextType.ITALIC:
+            return LeafNode("i", text_node.text, None, safe)
+        case TextType.CODE:
+            return LeafNode("code", text_node.text, None, safe)
+        case TextType.LINK:
+            url = resolve_url(text_node.url) if resolve_url else text_node.url
+            return LeafNode("a", text_node.text, freeze_props({"href": url}), safe)
+        case TextType.IMAGE:
+            url = resolve_url(text_node.url) if resolve_url else text_node.url
+            return LeafNode("img", "", freeze_props({"src": url, "alt": text_node.text}))
+        case TextType.EXTENSION:
+            return text_node.extension.render(text_node.match)
+        case _:
+            raise Exception(f"Invalid TextType {text_node.text_type}")
+
+
+def iter_text_nodes_to_html_nodes(text_nodes, safe=False, resolve_url=None):
+    for text_node in text_nodes:
+        yield text_node_to_html_node(text_node, safe, resolve_url)
+
+
+def text_nodes_to_html_nodes(text_nodes, safe=False, resolve_url=None):
+    return list(iter_text_nodes_to_html_nodes(text_nodes, safe, resolve_url))
+
+
+INLINE_FRAGMENT_LENGTH = 200
+INLINE_FRAGMENTS_LIMIT = 8192
+# Text nodes of short marked-up text, shared by every page rendered in this
+# process: navigation links, repeated headings and list items are parsed once
+INLINE_FRAGMENTS = FragmentTable(INLINE_FRAGMENTS_LIMIT)
+EXTENSIONS.listeners.append(INLINE_FRAGMENTS.clear)
+
+
+def inline_fragment(text):
+    if len(text) > INLINE_FRAGMENT_LENGTH or not has_inline_markup(text):
+        return None
+    text_nodes = INLINE_FRAGMENTS.get(text)
+    if text_nodes is None:
+        text_nodes = INLINE_FRAGMENTS.add(text, tuple(iter_text_to_textnodes(text)))
+    return text_nodes
+
+
+def text_to_html_nodes(text, on_text_nodes=None, resolve_url=None):
+    if on_text_nodes is None and not has_inline_markup(text):
+        return [LeafNode(None, text, None, not needs_escape(text))] if text else []
+    # Without a hook the text nodes are never held in a list; the only list
+    # built is the one the caller gets back
+    text_nodes = inline_fragment(text)
+    if text_nodes is None:
+        if on_text_nodes is not None:
+            text_nodes = text_to_textnodes(text)
+        else:
+            text_nodes = iter_text_to_textnodes(text)
+    if on_text_nodes is not None:
+        on_text_nodes(text_nodes)
+    # One scan of the source text covers every leaf cut from it
+    return list(iter_text_nodes_to_html_nodes(text_nodes, not needs_escape(text), resolve_url))
+
+
+def markdown_to_html_node(markdown, on_text_nodes=None, resolve_url=None, cache=None, outline=None):
+    root = ParentNode("div", [])
+    blocks = markdown_to_blocks(markdown)
+    if cache is not None:
+        for block in blocks:
+            root.children.append(cache.block_to_html_node(block, on_text_nodes, outline))
+        return root
+    for block in blocks:
+        root.children.append(block_to_html_node(block, on_text_nodes, resolve_url, outline))
+    return root
+
+
+def iter_markdown_html(markdown, on_text_nodes=None, resolve_url=None, cache=None, outline=None):
+    # The markup of markdown_to_html_node(...).to_html() one top-level
+    # section at a time; only the current section's nodes and html are
+    # alive, so huge pages can be streamed to disk
+    yield "<div>"
+    section = []
+    for block in iter_markdown_blocks(markdown):
+        if section and block.startswith(("# ", "## ")):
+            yield "".join(section)
+            section = []
+        if cache is not None:
+            node = cache.block_to_html_node(block, on_text_nodes, outline)
+        else:
+            node = block_to_html_node(block, on_text_nodes, resolve_url, outline)
+        section.append(node.to_html())
+    if not section:
+        raise ValueError("Children are missing")
+    yield "".join(section)
+    yield "</div>"
+
+
+SLUG_PATTERN = re.compile(r"[^\w\- ]")
+
+
+def slugify(text):
+    return SLUG_PATTERN.sub("", text.strip().lower()).replace(" ", "-") or "section"
+
+
+class Outline:
+    # The headings of one page in order, each with an id that is unique
+    # within the page: repeats get -1, -2, ... like GitHub's anchors
+    def __init__(self):
+        self.headings = []
+        self.slugs = {}
+
+    def add(self, level, text_nodes):
+        text = "".join(text_node.text for text_node in text_nodes)
+        slug = base = slugify(text)
+        count = self.slugs.get(base, 0)
+        while slug in self.slugs:
+            count += 1
+            slug = f"{base}-{count}"
+        self.slugs[base] = count
+        self.slugs.setdefault(slug, 0)
+        self.headings.append((level, slug, text))
+        return {"id": slug}
+
+    def to_html_node(self, min_level=2):
+        # Nested lists following the heading levels; the page title is left
+        # out by default
+        root = None
+        stack = []
+        for level, slug, text in self.headings:
+            if level < min_level:
+                continue
+            if root is None:
+                root = ParentNode("ul", [])
+                stack.append((level, root))
+            while len(stack) > 1 and level < stack[-1][0]:
+                if level > stack[-2][0]:
+                    # Between the parent and the open list: carry on that list
+                    # rather than opening a second one in the same item
+                    stack[-1] = (level, stack[-1][1])
+                    break
+                stack.pop()
+            if level > stack[-1][0]:
+                nested = ParentNode("ul", [])
+                stack[-1][1].children[-1].children.append(nested)
+                stack.append((level, nested))
+            link = LeafNode("a", text, {"href": f"#{slug}"})
+            stack[-1][1].children.append(ParentNode("li", [link]))
+        if root is None:
+            return None
+        return ParentNode("nav", [root], freeze_props({"class": "toc"}))
+
+    def to_html(self, min_level=2):
+        node = self.to_html_node(min_level)
+        return node.to_html() if node is not None else ""
+
+
+def markdown_outline(markdown):
+    # Just the outline, for when it is needed before the page is rendered
+    outline = Outline()
+    for block in iter_markdown_blocks(markdown):
+        if block_to_block_type(block) == BlockType.HEADING:
+            level, text = split_heading(block)
+            outline.add(level, iter_text_to_textnodes(text))
+    return outline
+
+
+BLOCK_CACHE_LIMIT = 65536
+
+
+class RenderCache:
+    # Rendered blocks and resolved templates kept between builds in one
+    # process; entries are only valid for the resolve_url they were made with
+    def __init__(self, resolve_url=None):
+        self.resolve_url = resolve_url
+        self.blocks = {}
+        self.templates = {}
+        self.hits = 0
+        self.misses = 0
+
+    def block_to_html_node(self, block, on_text_nodes=None, outline=None):
+        if outline is not None and block.startswith("#"):
+            # A heading's id depends on the headings before it on the page
+            return block_to_html_node(block, on_text_nodes, self.resolve_url, outline)
+        entry = self.blocks.get(block)
+        if entry is None:
+            self.misses += 1
+            # Keep the block's text nodes so hooks see them on every hit
+            text_nodes = []
+            node = block_to_html_node(block, text_nodes.extend, self.resolve_url)
+            if len(self.blocks) >= BLOCK_CACHE_LIMIT:
+                self.blocks.clear()
+            entry = self.blocks[block] = (node.to_html(), text_nodes)
+        else:
+            self.hits += 1
+        html, text_nodes = entry
+        if on_text_nodes is not None and text_nodes:
+            on_text_nodes(text_nodes)
+        return LeafNode(None, html, safe=True)
+
+    def template(self, path):
+        from pathlib import Path
+        from urls import resolve_template_urls
+        p = Path(path)
+        stat = p.stat()
+        key = (str(p), stat.st_mtime_ns, stat.st_size)
+        template = self.templates.get(key)
+        if template is None:
+            template = p.read_text()
+            if self.resolve_url is not None:
+                template = resolve_template_urls(template, self.resolve_url)
+            self.templates = {key: template}
+        return template
+
+
+def markdown_to_flat_document(markdown, on_text_nodes=None, resolve_url=None, outline=None):
+    from flatdoc import FlatDocument
+    # The page is kept as a FlatDocument event stream, and the common
+    # blocks are written into it without building their nodes at all
+    document = FlatDocument()
+    document.open("div")
+    for block in markdown_to_blocks(markdown):
+        block_to_flat_document(document, block, on_text_nodes, resolve_url, outline)
+    document.close()
+    return document
+
+
+FLAT_INLINE_TAGS = {TextType.TEXT: None, TextType.BOLD: "b", TextType.ITALIC: "i",
+                    TextType.CODE: "code"}
+
+
+def text_nodes_to_flat_document(document, text_nodes, safe=False, resolve_url=None):
+    for text_node in text_nodes:
+        tag = FLAT_INLINE_TAGS.get(text_node.text_type, "")
+        if tag == "":
+            # Links, images and extensions carry props or nodes of their own
+            document.append_node(text_node_to_html_node(text_node, safe, resolve_url))
+        else:
+            document.leaf(tag, text_node.text, None, safe)
+
+
+def text_to_flat_document(document, text, on_text_nodes=None, resolve_url=None):
+    # text_to_html_nodes, with the leaves written straight into document
+    if on_text_nodes is None and not has_inline_markup(text):
+        if text:
+            document.leaf(None, text, None, not needs_escape(text))
+        return
+    text_nodes = inline_fragment(text)
+    if text_nodes is None:
+        if on_text_nodes is not None:
+            text_nodes = text_to_textnodes(text)
+        else:
+            text_nodes = iter_text_to_textnodes(text)
+    if on_text_nodes is not None:
+        on_text_nodes(text_nodes)
+    text_nodes_to_flat_document(document, text_nodes, not needs_escape(text), resolve_url)
+
+
+def block_to_flat_document(document, block, on_text_nodes=None, resolve_url=None, outline=None):
+    # Paragraphs, headings and quotes are written as events; other blocks
+    # are flattened from the nodes block_to_html_node builds
+    match block_to_block_type(block):
+        case BlockType.PARAGRAPH:
+            tag, text = "p", " ".join(block.split("\n"))
+        case BlockType.HEADING:
+            count, text = split_heading(block)
+            tag = f"h{count}"
+            if outline is not None:
+                # The outline needs the heading's plain text, so keep its nodes
+                text_nodes = inline_fragment(text) or text_to_textnodes(text)
+                if on_text_nodes is not None:
+                    on_text_nodes(text_nodes)
+                document.open(tag, outline.add(count, text_nodes))
+                text_nodes_to_flat_document(document, text_nodes, not needs_escape(text),
+                                            resolve_url)
+                document.close()
+                return
+        case BlockType.QUOTE:
+            tag = "blockquote"
+            text = "\n".join(line.removeprefix("> ") for line in block.split("\n"))
+        case _:
+            document.append_node(block_to_html_node(block, on_text_nodes, resolve_url))
+            return
+    document.open(tag)
+    text_to_flat_document(document, text, on_text_nodes, resolve_url)
+    document.close()
+
+
+def split_heading(block):
+    count = 0
+    for char in block:
+        if char == '#':
+            count += 1
+        else:
+            break
+    return count, block[count+1:]
+
+
+def block_to_html_node(block, on_text_nodes=None, resolve_url=None, outline=None):
+    block_type = block_to_block_type(block)
+    match block_type:
+        case BlockType.HEADING:
+            count, text = split_heading(block)
+            if outline is None:
+                html_nodes = text_to_html_nodes(text, on_text_nodes, resolve_url)
+                return ParentNode(f"h{count}", html_nodes)
+            # The outline needs the heading's plain text, so keep its nodes
+            text_nodes = inline_fragment(text) or text_to_textnodes(text)
+            if on_text_nodes is not None:
+                on_text_nodes(text_nodes)
+            html_nodes = text_nodes_to_html_nodes(text_nodes, not needs_escape(text), resolve_url)
+            node = ParentNode(f"h{count}", html_nodes, outline.add(count, text_nodes))
+            return node
+
+        case BlockType.QUOTE:
+            node = ParentNode('blockquote', [])
+            lines = block.split('\n')
+            stripped = []
+            for line in lines:
+                stripped.append(line.removeprefix('> '))
+
+            html_nodes = text_to_html_nodes("\n".join(stripped), on_text_nodes, resolve_url)
+            node.children.extend(html_nodes)
+            return node
+
+        case BlockType.ORDERED_LIST | BlockType.UNORDERED_LIST:
+            return list_to_html_node(block, on_text_nodes, resolve_url)
+
+        case BlockType.TABLE:
+            return table_to_html_node(block, on_text_nodes, resolve_url)
+
+        case BlockType.CODE:
+            lines = block.split('\n')
+            stripped_lines = lines[1:-1]
+            text = "\n".join(stripped_lines) + "\n"
+            text_node = TextNode(text, TextType.TEXT)
+            if on_text_nodes is not None:
+                on_text_nodes([text_node])
+            language = language_name(lines[0][3:])
+            if not language:
+                html_node = text_node_to_html_node(text_node, not needs_escape(text))
+                return ParentNode('pre', [ParentNode("code", [html_node])])
+            props = freeze_props({"class": f"language-{language}"})
+            highlighted = highlight(text, language)
+            if highlighted is None:
+                html_node = text_node_to_html_node(text_node, not needs_escape(text))
+            else:
+                html_node = LeafNode(None, highlighted, safe=True)
+            node = ParentNode('pre', [ParentNode("code", [html_node], props)])
+            return node
+
+        case BlockType.PARAGRAPH:
+            lines = block.split('\n')
+            line = " ".join(lines)
+            node = ParentNode('p', [])
+
+            html_nodes = text_to_html_nodes(line, on_text_nodes, resolve_url)
+            node.children.extend(html_nodes)
+
+            return node
+        case BlockExtension():
+            return block_type.render(block, on_text_nodes, resolve_url)
+        case _:
+            html_nodes = text_to_html_nodes(block, on_text_nodes, resolve_url)
+            node = ParentNode('div', html_nodes)
+            return node
+
+
+class ListFrame:
+    def __init__(self, node, indent):
+        self.node = node
+        self.indent = indent
+        # Column where the open item's text starts, its finished paragraphs
+        # and nested lists, and the lines of the paragraph being read
+        self.content = indent
+        self.parts = []
+        self.lines = []
+
+
+def list_item_paragraph(frame, on_text_nodes, resolve_url):
+    if frame.lines:
+        text = " ".join(frame.lines)
+        frame.parts.append(text_to_html_nodes(text, on_text_nodes, resolve_url))
+        frame.lines = []
+
+
+def close_list_item(frame, on_text_nodes, resolve_url):
+    list_item_paragraph(frame, on_text_nodes, resolve_url)
+    # Items with several paragraphs wrap each one in <p>
+    loose = sum(type(part) is list for part in frame.parts) > 1
+    children = []
+    for part in frame.parts:
+        if type(part) is not list:
+            children.append(part)
+        elif loose:
+            children.append(ParentNode("p", part))
+        else:
+            children.extend(part)
+    frame.node.children.append(ParentNode("li", children))
+    frame.parts = []
+
+
+def new_list(match):
+    if match[2]:
+        return ParentNode("ul", [])
+    if match[3] != "1":
+        return ParentNode("ol", [], freeze_props({"start": int(match[3])}))
+    return ParentNode("ol", [])
+
+
+def list_to_html_node(block, on_text_nodes=None, resolve_url=None):
+    # One pass over the lines with a stack of open lists, so every line
+    # costs the same however deeply it is nested
+    stack = []
+    blank = False
+    for line in block.split("\n"):
+        if "\t" in line:
+            line = line.expandtabs(4)
+        match = LIST_ITEM_PATTERN.match(line)
+        if match is None:
+            text = line.lstrip(" ")
+            if not text:
+                blank = True
+                continue
+            frame = stack[-1]
+            if blank:
+                # After a blank line the indentation picks the item
+                indent = len(line) - len(text)
+                while len(stack) > 1 and indent < frame.content:
+                    close_list_item(stack.pop(), on_text_nodes, resolve_url)
+                    frame = stack[-1]
+                list_item_paragraph(frame, on_text_nodes, resolve_url)
+                blank = False
+            frame.lines.append(text)
+            continue
+        blank = False
+        indent = len(match[1])
+        # An item left of its list but still inside the parent item's text
+        # carries on that list
+        while len(stack) > 1 and indent < stack[-1].indent and indent < stack[-2].content:
+            close_list_item(stack.pop(), on_text_nodes, resolve_url)
+        if len(stack) > 1 and indent <= stack[-1].indent and (
+                stack[-1].node.tag != ("ul" if match[2] else "ol")):
+            # The other kind of marker ends a nested list; the next one
+            # opens in the same parent item
+            close_list_item(stack.pop(), on_text_nodes, resolve_url)
+        if stack and indent <= stack[-1].indent:
+            frame = stack[-1]
+            close_list_item(frame, on_text_nodes, resolve_url)
+        else:
+            node = new_list(match)
+            if stack:
+                parent = stack[-1]
+                list_item_paragraph(parent, on_text_nodes, resolve_url)
+                parent.parts.append(node)
+            frame = ListFrame(node, indent)
+            stack.append(frame)
+        frame.content = match.end()
+        text = line[frame.content:].strip()
+        if text:
+            frame.lines.append(text)
+    root = stack[0].node
+    while stack:
+        close_list_item(stack.pop(), on_text_nodes, resolve_url)
+    return root
+
+
+def table_alignment(cell):
+    if cell.endswith(":"):
+        return "center" if cell.startswith(":") else "right"
+    return "left" if cell.startswith(":") else None
+
+
+def table_cells(line, columns, on_text_nodes, resolve_url, plain):
+    # Cells without markup stay plain strings and skip the inline parser;
+    # hooks still get them as text nodes
+    cells = split_table_row(line)
+    if len(cells) < columns:
+        cells.extend([""] * (columns - len(cells)))
+    elif len(cells) > columns:
+        del cells[columns:]
+    for i, cell in enumerate(cells):
+        if has_inline_markup(cell):
+            cells[i] = text_to_html_nodes(cell, on_text_nodes, resolve_url)
+        elif cell and plain is not None:
+            plain.append(TextNode(cell, TextType.TEXT))
+    return cells
+
+
+def table_to_html_node(block, on_text_nodes=None, resolve_url=None):
+    lines = iter(block.split("\n"))
+    header_line = next(lines)
+    alignments = [table_alignment(cell) for cell in split_table_row(next(lines))]
+    columns = len(alignments)
+    plain = [] if on_text_nodes is not None else None
+    header = table_cells(header_line, columns, on_text_nodes, resolve_url, plain)
+    rows = []
+    for line in lines:
+        rows.append(table_cells(line, columns, on_text_nodes, resolve_url, plain))
+    if plain:
+        on_text_nodes(plain)
+    # Plain cells come straight from the block, so one scan of it decides
+    # whether any of them need escaping
+    return TableNode(header, rows, alignments, not needs_escape(block))
+
+
+def extract_title(markdown):
+    blocks = markdown.split("\n\n")
+    maybe_title = blocks[0]
+    if not maybe_title.startswith("# "):
+        raise Exception("Invalid Title")
+    title = maybe_title.removeprefix("# ")
+    stripped = title.strip()
+    return stripped
@@ -0,0 +1,167 @@
+import json
+import re
+from pathlib import Path
+from textnode import TextType
+from fragments import FragmentTable
+
+SEARCH_DIR = "search"
+PREFIX_LENGTH = 2
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on "
+    "or that the this to was were will with".split()
+)
+INDEXED_TYPES = (TextType.TEXT, TextType.BOLD, TextType.ITALIC,
+                 TextType.CODE, TextType.LINK, TextType.IMAGE)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOP_WORDS]
+
+
+def count_terms(text_nodes, counts):
+    for node in text_nodes:
+        if node.text_type not in INDEXED_TYPES:
+            continue
+        for token in tokenize(node.text):
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def term_prefix(term):
+    return term[:PREFIX_LENGTH].ljust(PREFIX_LENGTH, "_")
+
+
+class SearchIndex:
+    def __init__(self):
+        self.docs = {}
+        self.ids = {}
+        self.postings = {}
+        self.shards = {}
+        self.free_ids = []
+        self.next_id = 0
+        self.dirty = set()
+        self.docs_changed = False
+        # Every page keeps its own terms dict; the term strings themselves
+        # are shared between pages and with the postings
+        self.terms = FragmentTable()
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        p = Path(path)
+        if not p.is_file():
+            return index
+        try:
+            data = json.loads(p.read_text())
+        except ValueError:
+            return index
+        for url, doc in data.get("docs", {}).items():
+            index.ids[url] = doc["id"]
+            index.docs[url] = doc
+            doc["terms"] = index._add_postings(doc["id"], doc["terms"])
+        if index.ids:
+            index.next_id = max(index.ids.values()) + 1
+        used = set(index.ids.values())
+        index.free_ids = [i for i in range(index.next_id) if i not in used]
+        index.dirty.clear()
+        return index
+
+    def save(self, path):
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps({"docs": self.docs}, separators=(",", ":")))
+
+    def update(self, url, title, terms):
+        doc = self.docs.get(url)
+        if doc is not None and doc["title"] == title and doc["terms"] == terms:
+            return False
+        if doc is not None:
+            self._remove_postings(doc["id"], doc["terms"])
+            doc_id = doc["id"]
+        else:
+            doc_id = self._next_id()
+        self.ids[url] = doc_id
+        terms = self._add_postings(doc_id, terms)
+        self.docs[url] = {"id": doc_id, "title": title, "terms": terms}
+        self.docs_changed = True
+        return True
+
+    def retain(self, urls):
+        keep = set(urls)
+        for url in list(self.docs):
+            if url not in keep:
+                doc = self.docs.pop(url)
+                del self.ids[url]
+                self.free_ids.append(doc["id"])
+                self._remove_postings(doc["id"], doc["terms"])
+                self.docs_changed = True
+
+    def search(self, query):
+        # Mirrors what the client does with the shards: AND over terms
+        result = None
+        for term in tokenize(query):
+            matches = set(self.postings.get(term, {}))
+            result = matches if result is None else result & matches
+        if not result:
+            return []
+        by_id = {doc["id"]: url for url, doc in self.docs.items()}
+        return sorted(by_id[doc_id] for doc_id in result)
+
+    def write(self, dest_dir, force=False):
+        dest = Path(dest_dir) / SEARCH_DIR
+        docs_file = dest / "docs.json"
+        if not docs_file.is_file():
+            force = True
+        dest.mkdir(parents=True, exist_ok=True)
+        prefixes = set(self.shards) | self.dirty if force else set(self.dirty)
+        for prefix in prefixes:
+            shard = dest / f"{prefix}.json"
+            terms = self.shards.get(prefix)
+            if not terms:
+                if shard.exists():
+                    shard.unlink()
+                continue
+            data = {term: sorted(self.postings[term].items()) for term in sorted(terms)}
+            shard.write_text(json.dumps(data, separators=(",", ":")))
+        if force or self.docs_changed:
+            docs = {doc["id"]: [url, doc["title"]] for url, doc in self.docs.items()}
+            docs_file.write_text(json.dumps(docs, separators=(",", ":")))
+        written = len(prefixes)
+        self.dirty.clear()
+        self.docs_changed = False
+        return written
+
+    def _next_id(self):
+        # Reuse a freed id so existing postings keep their numbers
+        if self.free_ids:
+            return self.free_ids.pop()
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _add_postings(self, doc_id, terms):
+        interned = {}
+        for term, count in terms.items():
+            term = self.terms.intern(term)
+            interned[term] = count
+            self.postings.setdefault(term, {})[doc_id] = count
+            prefix = term_prefix(term)
+            self.shards.setdefault(prefix, set()).add(term)
+            self.dirty.add(prefix)
+        return interned
+
+    def _remove_postings(self, doc_id, terms):
+        for term in terms:
+            self.terms.release(term)
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            prefix = term_prefix(term)
+            self.dirty.add(prefix)
+            if not postings:
+                del self.postings[term]
+                self.shards[prefix].discard(term)
+                if not self.shards[prefix]:
+                    del self.shards[prefix]
@@ -1,5 +1,5 @@
 import unittest
-from src.blocknode import block_to_block_type, BlockType
+from blocknode import block_to_block_type, BlockType
 
 
 class TestBlockToBlockType(unittest.TestCase):
@@ -75,6 +75,25 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "1. Item with [link](url.com)\n2. Item with ![image](img.jpg)"
         self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
 
+    def test_block_to_block_type_ordered_list_past_nine(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 12))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+    def test_block_to_block_type_nested_list(self):
+        block = "- First\n  1. nested\n  2. nested\n- Second"
+        self.assertEqual(block_to_block_type(block), BlockType.UNORDERED_LIST)
+
+    def test_block_to_block_type_table(self):
+        block = "| a | b |\n|---|:-:|\n| 1 | 2 |"
+        self.assertEqual(block_to_block_type(block), BlockType.TABLE)
+
+    def test_block_to_block_type_table_without_outer_pipes(self):
+        self.assertEqual(block_to_block_type("a | b\n--|--"), BlockType.TABLE)
+
+    def test_block_to_block_type_table_column_mismatch(self):
+        block = "| a | b |\n|---|\n| 1 | 2 |"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
     def test_block_to_block_type_paragraph_plain_text(self):
         block = "This is a normal paragraph"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
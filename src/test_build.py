@@ -0,0 +1,215 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from build import BuildConfig, build, parse_args
+
+
+def make_site(root):
+    (root / "content" / "blog" / "tom").mkdir(parents=True)
+    (root / "content" / "index.md").write_text("# Home\n\n[Tom](/blog/tom) ![tom](/images/tom.png)")
+    (root / "content" / "blog" / "tom" / "index.md").write_text("# Tom\n\n[< Back Home](/)")
+    (root / "static" / "images").mkdir(parents=True)
+    (root / "static" / "images" / "tom.png").write_bytes(b"png")
+    (root / "template.html").write_text('<link href="/index.css">{{ Content }}')
+
+
+def config_for(root, **options):
+    return BuildConfig(root / "content", root / "template.html", root / "static",
+                       root / "docs", root / ".cache", **options)
+
+
+class TestBuild(unittest.TestCase):
+    def test_parse_args(self):
+        config = parse_args(["/base/", "-j", "4", "--dry-run", "--only", "blog/*"])
+        self.assertEqual(config.basepath, "/base/")
+        self.assertEqual(config.jobs, 4)
+        self.assertTrue(config.dry_run)
+        self.assertEqual(config.only, "blog/*")
+        self.assertEqual(parse_args([]).basepath, "")
+
+    def test_full_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            build(config_for(root, basepath="/base/"))
+            docs = root / "docs"
+            self.assertEqual((docs / "images" / "tom.png").read_bytes(), b"png")
+            self.assertEqual((docs / "blog" / "tom" / "index.html").read_text(),
+                             '<link href="/base/index.css"><div><h1 id="tom">Tom</h1>'
+                             '<p><a href="/base/">&lt; Back Home</a></p></div>')
+            self.assertTrue((docs / "sitemap.xml").is_file())
+            self.assertTrue((docs / "search" / "docs.json").is_file())
+            self.assertTrue((root / ".cache" / "metadata.json").is_file())
+
+    def test_dry_run_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            graph = build(config_for(root, dry_run=True))
+            self.assertFalse((root / "docs").exists())
+        self.assertIn("render blog/tom/index.md", graph.names)
+        self.assertIn("copy images/tom.png", graph.names)
+
+    def test_only_keeps_other_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            build(config_for(root))
+            home = root / "docs" / "index.html"
+            home.write_text("kept")
+            graph = build(config_for(root, only="blog/*"))
+            self.assertEqual(home.read_text(), "kept")
+        self.assertNotIn("render index.md", graph.names)
+        self.assertNotIn("prune", graph.names)
+
+    def test_rebuild_leaves_unchanged_files_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            first = build(config_for(root))
+            home = root / "docs" / "index.html"
+            mtime = home.stat().st_mtime_ns
+            second = build(config_for(root))
+            self.assertEqual(home.stat().st_mtime_ns, mtime)
+        stats = [task.result for task in first.tasks if task.name == "report writes"]
+        self.assertEqual(stats, [{"written": 3, "unchanged": 0, "pruned": 0}])
+        stats = [task.result for task in second.tasks if task.name == "report writes"]
+        self.assertEqual(stats, [{"written": 0, "unchanged": 3, "pruned": 0}])
+
+    def test_removed_page_is_pruned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            build(config_for(root))
+            (root / "content" / "blog" / "tom" / "index.md").unlink()
+            (root / "content" / "index.md").write_text("# Home")
+            build(config_for(root))
+            docs = root / "docs"
+            self.assertFalse((docs / "blog").exists())
+            self.assertTrue((docs / "index.html").is_file())
+            self.assertTrue((docs / "search" / "docs.json").is_file())
+
+    def test_warm_state_skips_unchanged_sources(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            config = config_for(root)
+            state = build(config).state
+            graph = build(config, state)
+            self.assertFalse([name for name in graph.names if name.startswith(("render", "copy"))])
+            page = root / "content" / "index.md"
+            page.write_text(page.read_text() + "\n\nMore")
+            graph = build(config, state)
+            self.assertEqual([name for name in graph.names if name.startswith("render")],
+                             ["render index.md"])
+            self.assertIn("<p>More</p>", (root / "docs" / "index.html").read_text())
+            (root / "template.html").write_text("<main>{{ Content }}</main>")
+            graph = build(config, state)
+            self.assertEqual(len([name for name in graph.names if name.startswith("render")]), 2)
+
+    def test_deferred_save_does_not_rewrite_feeds(self):
+        # The daemon only saves when idle; warm builds in between must not
+        # redo the feeds and link check for a change they already handled
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            config = config_for(root)
+            state = build(config).state
+            state.defer_save = True
+            page = root / "content" / "index.md"
+            page.write_text("# New home\n\n[Tom](/blog/tom)")
+            build(config, state)
+            self.assertTrue(state.index.changed)
+            sitemap = (root / "docs" / "sitemap.xml").stat().st_mtime_ns
+            graph = build(config, state)
+            results = {task.name: task.result for task in graph.tasks}
+            self.assertFalse(results["write feeds"])
+            self.assertFalse(results["update indexes"])
+            self.assertEqual((root / "docs" / "sitemap.xml").stat().st_mtime_ns, sitemap)
+
+    def test_failing_page_does_not_stop_the_build(self):
+        for jobs in (1, 2):
+            with tempfile.TemporaryDirectory() as tmp:
+                root = Path(tmp)
+                make_site(root)
+                bad = root / "content" / "blog" / "bad.md"
+                bad.write_text("# Bad\n\nan _unclosed emphasis")
+                config = config_for(root, jobs=jobs)
+                graph = build(config)
+                self.assertTrue((root / "docs" / "index.html").is_file())
+                self.assertTrue((root / "docs" / "blog" / "tom" / "index.html").is_file())
+                self.assertEqual([(failure.source, failure.stage) for failure in graph.failures],
+                                 [(str(bad), "parse")])
+                stats = [task.result for task in graph.tasks if task.name == "report writes"]
+                self.assertEqual(stats[0]["unchanged"], 0)
+                bad.write_text("# Bad\n\nfixed _now_")
+                graph = build(config, graph.state)
+                self.assertEqual(graph.failures, [])
+                self.assertEqual([name for name in graph.names if name.startswith("render")],
+                                 ["render blog/bad.md"])
+
+    def test_event_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            (root / "content" / "bad.md").write_text("# Bad\n\n_open")
+            log = root / "events.jsonl"
+            config = config_for(root, event_log=log)
+            state = build(config).state
+            build(config, state)
+            events = [json.loads(line) for line in log.read_text().splitlines()]
+        first = [event for event in events if event["build"] == events[0]["build"]]
+        self.assertEqual([event["event"] for event in first],
+                         ["build_start", "prune", "page_error", "page", "page", "copy",
+                          "build_end"])
+        pages = [event for event in first if event["event"] == "page"]
+        copy = next(event for event in first if event["event"] == "copy")
+        self.assertEqual((Path(copy["source"]).name, copy["written"]), ("tom.png", True))
+        self.assertEqual(sorted(event["page"] for event in pages), ["/", "/blog/tom/"])
+        self.assertEqual(list(pages[0]["stages"]), ["read", "front matter", "parse", "render", "write", "index"])
+        self.assertTrue(all(event["bytes"] > 0 for event in pages))
+        end = first[-1]
+        self.assertEqual((end["rendered"], end["failed"], end["written"]), (3, 1, 3))
+        second = [event for event in events if event["build"] != first[0]["build"]]
+        self.assertEqual(second[0]["warm"], True)
+        self.assertEqual([event["event"] for event in second], ["build_start", "page_error", "build_end"])
+
+    def test_page_limits_only_for_workers(self):
+        self.assertIsNone(config_for(Path("."), jobs=1).page_limits())
+        self.assertEqual(config_for(Path("."), jobs=2, page_cpu_limit=5,
+                                    page_memory_limit=100).page_limits(),
+                         (5, 100 * 1024 * 1024))
+        config = parse_args(["--page-cpu-limit", "2.5", "--page-memory-limit", "0"])
+        self.assertEqual((config.page_cpu_limit, config.page_memory_limit), (2.5, 0))
+
+    def test_parallel_build_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            build(config_for(root))
+            serial = (root / "docs" / "index.html").read_text()
+            build(config_for(root, jobs=2))
+            self.assertEqual((root / "docs" / "index.html").read_text(), serial)
+
+    def test_flat_document_build_matches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            (root / "content" / "index.md").write_text(
+                "# Home\n\n## Part\n\n> **quoted**\n\n- [Tom](/blog/tom)")
+            (root / "template.html").write_text("{{ Toc }}{{ Content }}")
+            build(config_for(root))
+            tree = (root / "docs" / "index.html").read_text()
+            graph = build(config_for(root, flat_document=True))
+            self.assertIn("render index.md", graph.names)
+            stats = [task.result for task in graph.tasks if task.name == "report writes"]
+            self.assertEqual(stats[0]["written"], 0)
+            self.assertEqual((root / "docs" / "index.html").read_text(), tree)
+            self.assertIn('<h2 id="part">', tree)
+        self.assertTrue(parse_args(["--flat-document"]).flat_document)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from buildgraph import BuildGraph, Task
+
+
+def square(value):
+    return value * value
+
+
+class TestBuildGraph(unittest.TestCase):
+    def test_runs_in_dependency_order(self):
+        seen = []
+        graph = BuildGraph()
+        first = graph.add(Task("first", seen.append, ("first",)))
+        second = graph.add(Task("second", seen.append, ("second",), [first]))
+        graph.add(Task("third", seen.append, ("third",), [first, second]))
+        graph.run()
+        self.assertEqual(seen, ["first", "second", "third"])
+
+    def test_dependencies_must_exist(self):
+        graph = BuildGraph()
+        orphan = Task("orphan", print)
+        with self.assertRaises(ValueError):
+            graph.add(Task("child", print, deps=[orphan]))
+        graph.add(orphan)
+        with self.assertRaises(ValueError):
+            graph.add(Task("orphan", print))
+
+    def test_dry_run_runs_nothing(self):
+        seen = []
+        graph = BuildGraph()
+        graph.add(Task("a", seen.append, (1,)))
+        tasks = graph.run(dry_run=True)
+        self.assertEqual([task.name for task in tasks], ["a"])
+        self.assertEqual(seen, [])
+        self.assertEqual((graph.state, graph.failures), (None, []))
+
+    def test_parallel_results_reach_local_tasks(self):
+        graph = BuildGraph()
+        squares = [graph.add(Task(f"square {i}", square, (i,))) for i in range(5)]
+        total = graph.add(Task("sum", lambda: sum(task.result for task in squares),
+                               deps=squares, local=True))
+        graph.run(jobs=2)
+        self.assertEqual(total.result, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
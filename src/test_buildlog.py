@@ -0,0 +1,56 @@
+import unittest
+
+from buildlog import format_summary, group_builds, percentile
+
+
+def page(build, time, seconds, path="/", parse=None):
+    return {"event": "page", "build": build, "time": time, "page": path, "bytes": 1024,
+            "written": True, "seconds": seconds,
+            "stages": {"read": seconds / 4, "parse": parse or seconds / 2, "write": seconds / 4}}
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = [0.5, 0.1, 0.4, 0.2, 0.3]
+        self.assertEqual(percentile(values, 0.5), 0.3)
+        self.assertEqual(percentile(values, 0.9), 0.5)
+        self.assertEqual(percentile(values, 0.0), 0.1)
+        self.assertEqual(percentile(values, 1.0), 0.5)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_percentile_of_even_counts(self):
+        self.assertEqual(percentile(list(range(1, 11)), 0.9), 9)
+        self.assertEqual(percentile(list(range(1, 11)), 0.99), 10)
+        self.assertEqual(percentile([2, 1], 0.5), 1)
+        self.assertEqual(percentile([6, 5, 4, 3, 2, 1], 0.5), 3)
+
+    def test_builds_are_grouped_in_time_order(self):
+        events = [
+            {"event": "build_start", "build": "b2", "time": 20},
+            page("b2", 21, 0.004),
+            {"event": "build_end", "build": "b2", "time": 22, "seconds": 2.0, "cache_hits": 3},
+            {"event": "build_start", "build": "b1", "time": 10},
+            page("b1", 11, 0.002, "/a/"),
+            page("b1", 11, 0.008, "/b/"),
+            {"event": "page_error", "build": "b1", "time": 11, "source": "c.md",
+             "stage": "parse", "seconds": 0.001, "message": "Exception: Closing delimiter missing"},
+            {"event": "build_end", "build": "b1", "time": 12, "seconds": 1.0},
+            {"event": "copy_dir", "time": 13},
+        ]
+        builds = group_builds(events)
+        self.assertEqual([build.build for build in builds], ["b1", "b2"])
+        self.assertEqual(len(builds[0].pages), 2)
+        self.assertEqual(len(builds[0].errors), 1)
+        self.assertEqual(builds[1].seconds, 2.0)
+        summary = format_summary(builds, top=1)
+        self.assertIn("+100%", summary)
+        self.assertIn("     8.00 ms  /b/  (mostly parse)", summary)
+        self.assertIn("c.md: parse after 0.00s: Exception: Closing delimiter missing", summary)
+        self.assertIn("total                3", summary)
+
+    def test_empty_logs(self):
+        self.assertEqual(format_summary([]), "no builds in the logs")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from daemon import BuildServer, request
+from test_build import make_site
+
+
+class TestBuildServer(unittest.TestCase):
+    def test_builds_over_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_site(root)
+            socket_path = root / "daemon.sock"
+            server = BuildServer(socket_path)
+            ready = threading.Event()
+            thread = threading.Thread(target=server.serve_forever, args=(ready.set,))
+            thread.start()
+            ready.wait(5)
+            argv = ["--content", str(root / "content"), "--template", str(root / "template.html"),
+                    "--static", str(root / "static"), "--dest", str(root / "docs"),
+                    "--cache", str(root / ".cache")]
+            try:
+                for junk in (b"", b"not json\n"):
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                        client.connect(str(socket_path))
+                        client.sendall(junk)
+                first = request({"argv": argv, "cwd": tmp}, socket_path)
+                second = request({"argv": argv, "cwd": tmp}, socket_path)
+                bad = request({"argv": ["--jobs", "x"], "cwd": tmp}, socket_path)
+            finally:
+                request({"stop": True}, socket_path)
+                thread.join(5)
+            self.assertEqual(first["status"], 0)
+            self.assertIn("3 files written", first["output"])
+            self.assertIn("0 files written, 3 unchanged", second["output"])
+            self.assertEqual(bad["status"], 2)
+            self.assertTrue((root / "docs" / "index.html").is_file())
+            self.assertTrue((root / ".cache" / "metadata.json").is_file())
+            self.assertFalse(socket_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
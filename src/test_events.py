@@ -0,0 +1,41 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from events import EventLog, read_events
+
+
+class TestEventLog(unittest.TestCase):
+    def test_events_are_json_lines_with_shared_fields(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "logs" / "events.jsonl"
+            log = EventLog()
+            log.open(path, build="b1")
+            log.emit("page", page="/", stages={"parse": 0.5})
+            log.close()
+            log.open(path, build="b2")
+            log.emit("build_end", source=Path("a.md"))
+            log.close()
+            lines = path.read_text().splitlines()
+        first, second = map(json.loads, lines)
+        self.assertEqual((first["event"], first["build"], first["page"]), ("page", "b1", "/"))
+        self.assertEqual(first["stages"], {"parse": 0.5})
+        self.assertEqual((second["build"], second["source"]), ("b2", "a.md"))
+        self.assertIsInstance(first["time"], float)
+
+    def test_closed_log_writes_nothing(self):
+        log = EventLog()
+        self.assertFalse(log.enabled)
+        log.emit("page", page="/")
+        log.close()
+
+    def test_read_events_skips_partial_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "events.jsonl"
+            path.write_text('{"event":"build_start","time":1}\n\n{"event":"pa')
+            self.assertEqual(read_events(path), [{"event": "build_start", "time": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
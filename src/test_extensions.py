@@ -0,0 +1,79 @@
+import unittest
+
+from blocknode import BlockType, block_to_block_type
+from extensions import EXTENSIONS, register_block, register_inline
+from htmlnode import LeafNode, ParentNode
+from render import INLINE_FRAGMENTS, markdown_to_html_node
+from textnode import TextNode, TextType
+
+
+def render_note(block, on_text_nodes, resolve_url):
+    text = block.removeprefix(":::note").strip()
+    return ParentNode("div", [LeafNode("p", text)], {"class": "note"})
+
+
+def render_mark(match):
+    return LeafNode("mark", match[1])
+
+
+class TestBlockExtensions(unittest.TestCase):
+    def tearDown(self):
+        EXTENSIONS.clear()
+
+    def test_registered_block_is_dispatched(self):
+        note = register_block("note", [":::note"], render_note)
+        self.assertIs(block_to_block_type(":::note\nMind the <gap>"), note)
+        html = markdown_to_html_node("# Title\n\n:::note\nMind the <gap>\n\nText").to_html()
+        self.assertEqual(html, '<div><h1>Title</h1><div class="note"><p>Mind the &lt;gap&gt;</p></div>'
+                               '<p>Text</p></div>')
+
+    def test_unmatched_blocks_keep_builtin_types(self):
+        register_block("note", [":::note"], render_note)
+        register_block("bang", ["!!!"], render_note, match=lambda block: block.endswith("!!!"))
+        self.assertEqual(block_to_block_type(":::tip"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("!!! not closed"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("![img](/a.png)"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("# Heading"), BlockType.HEADING)
+        self.assertEqual(sorted(EXTENSIONS.blocks), ["!", ":"])
+
+    def test_extension_can_override_builtin(self):
+        register_block("mermaid", ["```mermaid"], lambda block, hook, resolve: LeafNode("pre", "graph"))
+        self.assertEqual(markdown_to_html_node("```mermaid\na-->b\n```").to_html(),
+                         "<div><pre>graph</pre></div>")
+
+    def test_empty_prefix_is_rejected(self):
+        with self.assertRaises(ValueError):
+            register_block("any", [""], render_note)
+
+
+class TestInlineExtensions(unittest.TestCase):
+    def tearDown(self):
+        EXTENSIONS.clear()
+
+    def test_registered_inline_markup(self):
+        register_inline("mark", "==", r"==(.+?)==", render_mark)
+        html = markdown_to_html_node("plain ==marked== and **bold** ==x==").to_html()
+        self.assertEqual(html, "<div><p>plain <mark>marked</mark> and <b>bold</b> <mark>x</mark></p></div>")
+
+    def test_earliest_match_wins_and_hooks_see_extension_nodes(self):
+        register_inline("mark", "==", r"==(.+?)==", render_mark)
+        register_inline("kbd", "++", r"\+\+(.+?)\+\+", lambda match: LeafNode("kbd", match[1]))
+        seen = []
+        html = markdown_to_html_node("press ++ctrl++ then ==look== [x](/x)", seen.extend).to_html()
+        self.assertEqual(html, '<div><p>press <kbd>ctrl</kbd> then <mark>look</mark> '
+                               '<a href="/x">x</a></p></div>')
+        self.assertEqual([node.text_type for node in seen].count(TextType.EXTENSION), 2)
+        self.assertIn(TextNode("x", TextType.LINK, "/x"), seen)
+
+    def test_registering_clears_interned_fragments(self):
+        text = "**a** ==b=="
+        markdown_to_html_node(text)
+        self.assertIn(text, INLINE_FRAGMENTS)
+        register_inline("mark", "==", r"==(.+?)==", render_mark)
+        self.assertNotIn(text, INLINE_FRAGMENTS)
+        self.assertEqual(markdown_to_html_node(text).to_html(),
+                         "<div><p><b>a</b> <mark>b</mark></p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
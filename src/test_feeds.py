@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from feeds import write_atom_feed, write_feeds, write_sitemap
+from metadata import MetadataIndex, PageMeta
+
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9",
+      "atom": "http://www.w3.org/2005/Atom"}
+
+
+def make_pages(count):
+    return [PageMeta(f"/p{i}/", f"Page {i}", f"2024-01-{i % 28 + 1:02d}", [], str(i))
+            for i in range(count)]
+
+
+class TestSitemap(unittest.TestCase):
+    def test_single_sitemap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = write_sitemap(make_pages(3), tmp, "https://example.com/base")
+            root = ET.parse(Path(tmp) / "sitemap.xml").getroot()
+        self.assertEqual(files, ["sitemap.xml"])
+        locs = [loc.text for loc in root.findall("sm:url/sm:loc", NS)]
+        self.assertEqual(locs, ["https://example.com/base/p0/",
+                                "https://example.com/base/p1/",
+                                "https://example.com/base/p2/"])
+
+    def test_split_into_index_and_remove_stale(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "sitemap-9.xml").write_text("stale")
+            files = write_sitemap(make_pages(5), tmp, "https://example.com", limit=2)
+            index = ET.parse(Path(tmp) / "sitemap.xml").getroot()
+            second = ET.parse(Path(tmp) / "sitemap-2.xml").getroot()
+            remaining = sorted(p.name for p in Path(tmp).iterdir())
+        self.assertEqual(files, ["sitemap.xml", "sitemap-1.xml",
+                                 "sitemap-2.xml", "sitemap-3.xml"])
+        self.assertEqual(len(index.findall("sm:sitemap", NS)), 3)
+        self.assertEqual(len(second.findall("sm:url", NS)), 2)
+        self.assertEqual(remaining, sorted(files))
+
+
+class TestAtomFeed(unittest.TestCase):
+    def test_newest_first_and_escaped(self):
+        pages = [PageMeta("/a/", "Old", "2024-01-01", [], "a"),
+                 PageMeta("/b/", "New & <shiny>", "2024-02-01", ["x"], "b"),
+                 PageMeta("/c/", "Undated", None, [], "c")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "atom.xml"
+            self.assertTrue(write_atom_feed(pages, path, "https://example.com", "Site"))
+            root = ET.parse(path).getroot()
+        titles = [t.text for t in root.findall("atom:entry/atom:title", NS)]
+        self.assertEqual(titles, ["New & <shiny>", "Old"])
+        self.assertEqual(root.find("atom:updated", NS).text,
+                         "2024-02-01T00:00:00Z")
+        self.assertEqual(root.find("atom:author/atom:name", NS).text, "Site")
+        self.assertEqual(root.find("atom:link[@rel='self']", NS).get("href"),
+                         "https://example.com/atom.xml")
+
+    def test_no_dated_pages_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "atom.xml"
+            self.assertFalse(write_atom_feed(make_pages(0), path, "https://e.com", "S"))
+            self.assertFalse(path.exists())
+
+
+class TestWriteFeeds(unittest.TestCase):
+    def test_skips_when_metadata_unchanged(self):
+        index = MetadataIndex(make_pages(2))
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertTrue(write_feeds(index, tmp, "https://e.com", "S"))
+            self.assertFalse(write_feeds(index, tmp, "https://e.com", "S"))
+            index.update(PageMeta("/new/", "New", None, [], "n"))
+            self.assertTrue(write_feeds(index, tmp, "https://e.com", "S"))
+
+    def test_rewrites_when_site_url_or_title_change(self):
+        index = MetadataIndex(make_pages(2))
+        with tempfile.TemporaryDirectory() as tmp:
+            stamp = Path(tmp) / "cache" / "feeds.json"
+            self.assertTrue(write_feeds(index, tmp, "https://e.com/base", "S", stamp=stamp))
+            self.assertFalse(write_feeds(index, tmp, "https://e.com/base", "S", stamp=stamp))
+            self.assertTrue(write_feeds(index, tmp, "https://e.org", "S", stamp=stamp))
+            root = ET.parse(Path(tmp) / "sitemap.xml").getroot()
+            self.assertEqual(root.find("sm:url/sm:loc", NS).text, "https://e.org/p0/")
+            self.assertTrue(write_feeds(index, tmp, "https://e.org", "T", stamp=stamp))
+            self.assertFalse(write_feeds(index, tmp, "https://e.org", "T", stamp=stamp))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from pathlib import Path
+
+from flatdoc import CLOSE, LEAF, OPEN, RAW, FlatDocument
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from render import Outline, block_to_flat_document, markdown_to_flat_document, markdown_to_html_node
+from urls import UrlResolver
+from markdown_parser import split_front_matter
+
+CONTENT_DIR = Path(__file__).resolve().parent.parent / "content"
+
+
+class RawNode(HTMLNode):
+    def to_html(self):
+        return "<hr>"
+
+
+class TestFlatDocument(unittest.TestCase):
+    def test_event_stream(self):
+        document = FlatDocument()
+        document.open("p", {"class": "x"})
+        document.leaf(None, "Hi ")
+        document.leaf("b", "there")
+        document.close()
+        self.assertEqual(list(document.opcodes), [OPEN, LEAF, LEAF, CLOSE])
+        self.assertEqual(document.tags, [None, "p", "b"])
+        self.assertEqual(document.to_html(), '<p class="x">Hi <b>there</b></p>')
+
+    def test_append_node_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("ul", [ParentNode("li", [LeafNode("a", "home", {"href": "/"})])]),
+            LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+            RawNode(),
+        ])
+        document = FlatDocument()
+        document.append_node(node)
+        self.assertEqual(document.to_html(), node.to_html())
+
+    def test_empty_parent_raises(self):
+        document = FlatDocument()
+        document.open("div")
+        with self.assertRaises(ValueError):
+            document.close()
+        with self.assertRaises(ValueError):
+            FlatDocument().append_node(ParentNode("div", []))
+
+    def test_unclosed_raises(self):
+        document = FlatDocument()
+        document.open("div")
+        with self.assertRaises(ValueError):
+            document.to_html()
+
+    def test_lazy_root_view(self):
+        document = markdown_to_flat_document("# Title\n\nSome **bold** text")
+        root = document.root
+        self.assertIs(document.root, root)
+        self.assertEqual(root.tag, "div")
+        self.assertEqual([child.tag for child in root.children], ["h1", "p"])
+        self.assertEqual(root.to_html(), document.to_html())
+
+    def test_content_pages_match_node_tree(self):
+        for path in sorted(CONTENT_DIR.rglob("*.md")):
+            with self.subTest(path=path.name):
+                body = split_front_matter(path.read_text())[1]
+                self.assertEqual(markdown_to_flat_document(body).to_html(),
+                                 markdown_to_html_node(body).to_html())
+                flat, tree = Outline(), Outline()
+                self.assertEqual(markdown_to_flat_document(body, outline=flat).to_html(),
+                                 markdown_to_html_node(body, outline=tree).to_html())
+                self.assertEqual(flat.headings, tree.headings)
+
+    def test_blocks_written_directly_match_node_tree(self):
+        markdown = ("## A `code` & <b>\n\nSome **bold**, _it_ and [a](/a) ![i](/i.png)\n\n"
+                    "> quoted\n> **twice**\n\n- item\n\nplain text")
+        resolve = UrlResolver("/base")
+        flat_nodes, tree_nodes = [], []
+        flat = markdown_to_flat_document(markdown, flat_nodes.extend, resolve)
+        tree = markdown_to_html_node(markdown, tree_nodes.extend, resolve)
+        self.assertEqual(flat.to_html(), tree.to_html())
+        self.assertEqual(flat_nodes, tree_nodes)
+
+    def test_paragraph_is_events_only(self):
+        document = FlatDocument()
+        block_to_flat_document(document, "Some **bold** text")
+        self.assertEqual(list(document.opcodes), [OPEN, RAW, RAW, RAW, CLOSE])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from fragments import FragmentTable
+
+
+class TestFragmentTable(unittest.TestCase):
+    def test_intern_shares_one_copy(self):
+        table = FragmentTable()
+        first = table.intern("".join(["back", " home"]))
+        second = table.intern("".join(["back ", "home"]))
+        self.assertIs(first, second)
+        self.assertEqual(table.refs("back home"), 2)
+
+    def test_release_forgets_with_last_holder(self):
+        table = FragmentTable()
+        table.intern("/")
+        table.intern("/")
+        table.release("/")
+        self.assertIn("/", table)
+        table.release("/")
+        self.assertNotIn("/", table)
+        table.release("/")
+        self.assertEqual(len(table), 0)
+
+    def test_evict_keeps_shared_entries(self):
+        table = FragmentTable(limit=3)
+        table.add("a", 1)
+        table.get("a")
+        table.add("b", 2)
+        table.add("c", 3)
+        table.add("d", 4)
+        self.assertEqual(sorted(table.entries), ["a", "d"])
+
+    def test_top_ranks_by_saved_characters(self):
+        table = FragmentTable()
+        for text in ["[< Back Home](/)"] * 3 + ["tolkien"] * 5 + ["once"]:
+            table.intern(text)
+        self.assertEqual(table.top(), [("[< Back Home](/)", 3), ("tolkien", 5)])
+        self.assertEqual(table.top(1), [("[< Back Home](/)", 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from highlight import highlight, language_name
+
+
+class TestLanguageName(unittest.TestCase):
+    def test_aliases(self):
+        self.assertEqual(language_name("py"), "python")
+        self.assertEqual(language_name(" Bash "), "shell")
+        self.assertEqual(language_name("json title=x"), "json")
+        self.assertEqual(language_name(""), "")
+
+
+class TestHighlight(unittest.TestCase):
+    def test_python(self):
+        self.assertEqual(
+            highlight('def f():\n    return "<a>"  # 1\n', "python"),
+            '<span class="tok-keyword">def</span> f():\n'
+            '    <span class="tok-keyword">return</span> <span class="tok-string">"&lt;a&gt;"</span>'
+            '  <span class="tok-comment"># 1</span>\n',
+        )
+
+    def test_python_hash_in_string_is_not_comment(self):
+        self.assertEqual(highlight("'#x'", "python"), '<span class="tok-string">\'#x\'</span>')
+
+    def test_shell(self):
+        self.assertEqual(
+            highlight("echo $HOME # home", "shell"),
+            'echo <span class="tok-variable">$HOME</span> <span class="tok-comment"># home</span>',
+        )
+
+    def test_json(self):
+        self.assertEqual(
+            highlight('{"a": [1, null, "b"]}', "json"),
+            '{<span class="tok-key">"a"</span>: [<span class="tok-number">1</span>, '
+            '<span class="tok-literal">null</span>, <span class="tok-string">"b"</span>]}',
+        )
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("func main() {}", "go"))
+
+    def test_memoized(self):
+        code = "x = 1 if y else 2\n"
+        self.assertIs(highlight(code, "python"), highlight("".join(code), "python"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,19 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import pickle
+
+from htmlnode import (
+    CLOSE_TAGS,
+    OPEN_TAGS,
+    FrozenProps,
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    TableNode,
+    escape_attr,
+    escape_text,
+    freeze_props,
+)
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -30,6 +43,87 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(repr(node), expected)
 
 
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && "c" > d'),
+                         'a &lt; b &amp;&amp; "c" &gt; d')
+
+    def test_escape_text_fast_path_returns_same_object(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attr_quotes(self):
+        self.assertEqual(escape_attr('say "hi" & <go>'),
+                         "say &quot;hi&quot; &amp; &lt;go&gt;")
+
+    def test_leaf_value_and_props_escaped(self):
+        node = LeafNode("a", "< Back", {"href": '/?a=1&b="2"'})
+        self.assertEqual(node.to_html(),
+                         '<a href="/?a=1&amp;b=&quot;2&quot;">&lt; Back</a>')
+
+    def test_safe_leaf_is_not_escaped(self):
+        node = LeafNode("span", "<em>x</em>", safe=True)
+        self.assertEqual(node.to_html(), "<span><em>x</em></span>")
+
+
+class TestTagTables(unittest.TestCase):
+    def test_known_tag(self):
+        self.assertEqual(OPEN_TAGS["li"], "<li>")
+        self.assertEqual(CLOSE_TAGS["li"], "</li>")
+
+    def test_unknown_tag_is_added(self):
+        self.assertEqual(OPEN_TAGS["marquee"], "<marquee>")
+        self.assertIn("marquee", OPEN_TAGS)
+        self.assertEqual(LeafNode("marquee", "hi").to_html(), "<marquee>hi</marquee>")
+
+
+class TestFrozenProps(unittest.TestCase):
+    def test_html_matches_dict(self):
+        props = {"href": '/?a=1&b="2"', "title": "x"}
+        self.assertEqual(FrozenProps(props).html,
+                         HTMLNode(props=props).props_to_html())
+        self.assertEqual(HTMLNode(props=FrozenProps(props)).props_to_html(),
+                         HTMLNode(props=props).props_to_html())
+
+    def test_immutable(self):
+        props = FrozenProps({"href": "/"})
+        with self.assertRaises(TypeError):
+            props["href"] = "/other"
+        with self.assertRaises(TypeError):
+            props.update(title="x")
+        with self.assertRaises(TypeError):
+            del props["href"]
+        self.assertEqual(props.html, ' href="/"')
+
+    def test_equal_to_dict(self):
+        self.assertEqual(FrozenProps({"href": "/"}), {"href": "/"})
+
+    def test_freeze_props_shares_instances(self):
+        first = freeze_props({"src": "/a.png", "alt": "a"})
+        self.assertIs(first, freeze_props({"src": "/a.png", "alt": "a"}))
+        self.assertIsNot(first, freeze_props({"src": "/b.png", "alt": "a"}))
+
+    def test_pickle(self):
+        props = pickle.loads(pickle.dumps(FrozenProps({"href": "/"})))
+        self.assertIsInstance(props, FrozenProps)
+        self.assertEqual(props.html, ' href="/"')
+
+
+class TestTableNode(unittest.TestCase):
+    def test_to_html(self):
+        node = TableNode(["a", [LeafNode("b", "b")]], [["1 < 2", ""]], ["right", None])
+        self.assertEqual(
+            node.to_html(),
+            '<table><thead><tr><th style="text-align: right">a</th><th><b>b</b></th></tr></thead>'
+            '<tbody><tr><td style="text-align: right">1 &lt; 2</td><td></td></tr></tbody></table>',
+        )
+
+    def test_inside_parent(self):
+        node = ParentNode("div", [TableNode(["a"], [], safe=True)])
+        self.assertEqual(node.to_html(),
+                         "<div><table><thead><tr><th>a</th></tr></thead></table></div>")
+
+
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
@@ -187,6 +281,19 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             node.to_html()
 
+    def test_to_html_nested_empty_children_raises(self):
+        node = ParentNode("div", [LeafNode("p", "ok"), ParentNode("ul", [])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_to_html_beyond_recursion_limit(self):
+        node = LeafNode("em", "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "<em>deep</em>"))
+        self.assertTrue(html.endswith("</span>" * 5000))
+
     def test_parent_repr(self):
         child = LeafNode("span", "child")
         parent_node = ParentNode("div", [child], {"class": "test"})
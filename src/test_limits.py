@@ -0,0 +1,45 @@
+import mmap
+import resource
+import time
+import unittest
+
+from limits import PageTimeout, page_limits
+
+
+class TestPageLimits(unittest.TestCase):
+    def test_cpu_limit_raises_and_is_lifted(self):
+        before = resource.getrlimit(resource.RLIMIT_CPU)
+        with self.assertRaises(PageTimeout):
+            with page_limits(cpu_seconds=0.01):
+                deadline = time.monotonic() + 10
+                while time.monotonic() < deadline:
+                    pass
+        self.assertEqual(resource.getrlimit(resource.RLIMIT_CPU), before)
+
+    def test_memory_limit_raises_and_is_lifted(self):
+        before = resource.getrlimit(resource.RLIMIT_AS)
+        with self.assertRaises(MemoryError):
+            with page_limits(memory_bytes=256 * 1024 * 1024):
+                bytearray(1024 * 1024 * 1024)
+        self.assertEqual(resource.getrlimit(resource.RLIMIT_AS), before)
+        self.assertEqual(len(bytearray(300 * 1024 * 1024)), 300 * 1024 * 1024)
+
+    def test_memory_limit_is_on_top_of_what_is_mapped(self):
+        # A parent that already maps more than the budget still renders
+        mapped = mmap.mmap(-1, 512 * 1024 * 1024)
+        try:
+            with page_limits(memory_bytes=256 * 1024 * 1024):
+                self.assertEqual(len(bytearray(64 * 1024 * 1024)), 64 * 1024 * 1024)
+                with self.assertRaises(MemoryError):
+                    bytearray(512 * 1024 * 1024)
+        finally:
+            mapped.close()
+
+    def test_no_limits(self):
+        before = resource.getrlimit(resource.RLIMIT_CPU)
+        with page_limits():
+            self.assertEqual(resource.getrlimit(resource.RLIMIT_CPU), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
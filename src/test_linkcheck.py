@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from linkcheck import BrokenLink, LinkChecker, canonical_path, collect_links, link_target
+from textnode import TextNode, TextType
+
+
+class TestLinkTarget(unittest.TestCase):
+    def test_canonical_path(self):
+        self.assertEqual(canonical_path("/blog/tom/"), "/blog/tom")
+        self.assertEqual(canonical_path("/blog/tom/index.html"), "/blog/tom")
+        self.assertEqual(canonical_path("/"), "/")
+
+    def test_external_and_fragment_links_are_skipped(self):
+        for url in ("https://boot.dev", "mailto:a@b.c", "#top", ""):
+            with self.subTest(url=url):
+                self.assertIsNone(link_target("/blog/tom/", url))
+
+    def test_relative_links_resolve_against_page(self):
+        self.assertEqual(link_target("/blog/tom/", "../majesty"), "/blog/majesty")
+        self.assertEqual(link_target("/about.html", "contact/#x"), "/contact")
+        self.assertEqual(link_target("/blog/tom/", "/images/tom.png?v=1"),
+                         "/images/tom.png")
+
+
+class TestLinkChecker(unittest.TestCase):
+    def test_collect_links(self):
+        nodes = [
+            TextNode("home", TextType.LINK, "/"),
+            TextNode("text", TextType.TEXT),
+            TextNode("tom", TextType.IMAGE, "/images/tom.png"),
+        ]
+        self.assertEqual(collect_links(nodes, []),
+                         [("link", "/"), ("image", "/images/tom.png")])
+
+    def test_check_reports_source_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "index.md"
+            source.write_text("# Tom\n\n[< Back Home](/)\n\n![x](/images/missing.png)\n")
+            checker = LinkChecker()
+            checker.update("/blog/tom/", source, "h",
+                           [("link", "/"), ("image", "/images/missing.png")])
+            broken = checker.check({"/", "/blog/tom/", "/images/tom.png"})
+        self.assertEqual(broken, [BrokenLink(str(source), 5, "image",
+                                             "/images/missing.png")])
+
+    def test_link_urls_are_shared_between_pages(self):
+        checker = LinkChecker()
+        checker.update("/a/", "a.md", "h1", [("link", "".join(["/b", "/"]))])
+        checker.update("/c/", "c.md", "h2", [("link", "".join(["/", "b/"]))])
+        self.assertIs(checker.pages["/a/"]["links"][0][1], checker.pages["/c/"]["links"][0][1])
+        checker.update("/a/", "a.md", "h3", [])
+        self.assertEqual(checker.urls.refs("/b/"), 1)
+        checker.retain(["/a/"])
+        self.assertEqual(len(checker.urls), 0)
+
+    def test_cache_round_trip_and_retain(self):
+        checker = LinkChecker()
+        checker.update("/a/", "a.md", "h1", [("link", "/b/")])
+        checker.update("/b/", "b.md", "h2", [])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "links.json"
+            checker.save(path)
+            loaded = LinkChecker.load(path)
+        self.assertEqual(loaded.pages["/a/"]["hash"], "h1")
+        loaded.retain(["/a/"])
+        self.assertEqual(len(loaded.check({"/a/"})), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
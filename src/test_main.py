@@ -1,184 +1,118 @@
+import tempfile
+import tracemalloc
 import unittest
-from main import markdown_to_html_node, text_node_to_html_node, extract_title
-from textnode import TextNode, TextType
-
-
-def test_text(self):
-    node = TextNode("This is a text node", TextType.TEXT)
-    html_node = text_node_to_html_node(node)
-    self.assertEqual(html_node.tag, None)
-    self.assertEqual(html_node.value, "This is a text node")
-
-
-class TestMarkdownToHTML(unittest.TestCase):
-    def test_basic(self):
-        md = """
-This is just **text**
-Same
-
-Another
-"""
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><p>This is just <b>text</b> Same</p><p>Another</p></div>"
-        )
-
-    def test_paragraphs(self):
-        md = """
-This is **bolded** paragraph
-text in a p
-tag here
-
-This is another paragraph with _italic_ text and `code` here
-
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
-        )
-
-    def test_codeblock(self):
-        md = """
-```
-This is text that _should_ remain
-the **same** even with inline stuff
-```
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
-        )
-
-    def test_quote_block(self):
-        md = """
-> This is a quote
-> Another line
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><blockquote>This is a quote\nAnother line</blockquote></div>",
-        )
-
-    def test_unordered_list_block(self):
-        md = """
-- Item 1
-- Item 2
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><ul><li>Item 1</li><li>Item 2</li></ul></div>",
-        )
-
-    def test_ordered_list_block(self):
-        md = """
-1. First
-2. Second
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><ol><li>First</li><li>Second</li></ol></div>",
-        )
-
-    def test_headings(self):
-        md = """
-# Heading 1
-
-## Heading 2
-
-### Heading 3
-
-#### Heading 4
-
-##### Heading 5
-
-###### Heading 6
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><h1>Heading 1</h1><h2>Heading 2</h2><h3>Heading 3</h3><h4>Heading 4</h4><h5>Heading 5</h5><h6>Heading 6</h6></div>",
-        )
-
-    def test_paragraph_simple(self):
-        md = """
-This is a simple paragraph.
-"""
-
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
-            "<div><p>This is a simple paragraph.</p></div>",
-        )
-
-
-class TestExtractTitle(unittest.TestCase):
-    def test_extract_title_basic(self):
-        markdown = "# Title"
-        self.assertEqual(extract_title(markdown), "Title")
-
-    def test_extract_title_with_spaces(self):
-        markdown = "# Title with spaces  "
-        self.assertEqual(extract_title(markdown), "Title with spaces")
-
-    def test_extract_title_with_inline_formatting(self):
-        markdown = "# Title with **bold**"
-        self.assertEqual(extract_title(markdown), "Title with **bold**")
-
-    def test_extract_title_with_multiple_paragraphs(self):
-        markdown = "# Title\n\nParagraph"
-        self.assertEqual(extract_title(markdown), "Title")
-
-    def test_extract_title_with_newline_in_block(self):
-        markdown = "# Title\ncontinuation"
-        self.assertEqual(extract_title(markdown), "Title\ncontinuation")
-
-    def test_extract_title_empty_title(self):
-        markdown = "# "
-        self.assertEqual(extract_title(markdown), "")
-
-    def test_extract_title_invalid_no_hash(self):
-        with self.assertRaises(Exception):
-            extract_title("Paragraph")
-
-    def test_extract_title_invalid_wrong_heading_level(self):
-        with self.assertRaises(Exception):
-            extract_title("## Title")
-
-    def test_extract_title_invalid_no_space_after_hash(self):
-        with self.assertRaises(Exception):
-            extract_title("#Title")
-
-    def test_extract_title_invalid_empty_markdown(self):
-        with self.assertRaises(Exception):
-            extract_title("")
-
-    def test_extract_title_invalid_leading_empty_block(self):
-        with self.assertRaises(Exception):
-            extract_title("\n\n# Title")
-
-    def test_extract_title_invalid_multiple_hashes(self):
-        with self.assertRaises(Exception):
-            extract_title("### Title")
+from pathlib import Path
+import main
+import pickle
+from main import PageError, generate_pages, page_url, render_page
+from metadata import MetadataIndex
+from render import INLINE_FRAGMENTS, RenderCache
+
+
+class TestChunkedRenderPage(unittest.TestCase):
+    def test_chunked_page_matches_whole_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "page.md").write_text(
+                "# Big\n\n[home](/)\n\n## Part\n\n" + "\n\n".join(
+                    f"Paragraph {i} with **bold** & <stuff>" for i in range(200)))
+            (root / "template.html").write_text(
+                "<title>{{ Title }}</title>{{ Toc }}<main>{{ Content }}</main>{{ Toc }}")
+            whole = render_page(root / "page.md", root / "template.html", root / "whole.html")
+            size = main.CHUNKED_PAGE_SIZE
+            main.CHUNKED_PAGE_SIZE = 0
+            try:
+                chunked = render_page(root / "page.md", root / "template.html",
+                                      root / "chunked.html")
+            finally:
+                main.CHUNKED_PAGE_SIZE = size
+            self.assertEqual((root / "chunked.html").read_text(),
+                             (root / "whole.html").read_text())
+            self.assertEqual((root / "whole.html").read_text().count('<a href="#part">'), 2)
+        self.assertEqual(chunked.terms, whole.terms)
+        self.assertEqual(chunked.links, whole.links)
+
+    def test_chunked_page_memory_with_a_cache(self):
+        def peak(root, cache):
+            INLINE_FRAGMENTS.clear()
+            tracemalloc.start()
+            try:
+                render_page(root / "page.md", root / "template.html", root / "page.html",
+                            cache=cache)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "page.md").write_text("# Big\n\n" + "\n\n".join(
+                f"Paragraph {i} with **bold** and [a link](/p{i}/)" for i in range(3000)))
+            (root / "template.html").write_text("{{ Content }}")
+            size = main.CHUNKED_PAGE_SIZE
+            main.CHUNKED_PAGE_SIZE = 0
+            try:
+                cache = RenderCache()
+                uncached = peak(root, None)
+                cached = peak(root, cache)
+            finally:
+                main.CHUNKED_PAGE_SIZE = size
+        self.assertEqual(cache.blocks, {})
+        self.assertLess(cached, uncached * 1.25)
+
+
+class TestPageErrors(unittest.TestCase):
+    def test_failures_name_the_stage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "template.html").write_text("{{ Content }}")
+            (root / "open.md").write_text("# Open\n\nan _unclosed emphasis")
+            (root / "untitled.md").write_text("no title here")
+            with self.assertRaises(PageError) as raised:
+                render_page(root / "open.md", root / "template.html", root / "open.html")
+            self.assertEqual(raised.exception.stage, "parse")
+            self.assertEqual(raised.exception.message, "Exception: Closing delimiter missing")
+            self.assertEqual(raised.exception.source, str(root / "open.md"))
+            with self.assertRaises(PageError) as raised:
+                render_page(root / "untitled.md", root / "template.html", root / "untitled.html")
+            self.assertEqual(raised.exception.stage, "front matter")
+            with self.assertRaises(PageError) as raised:
+                render_page(root / "missing.md", root / "template.html", root / "missing.html")
+            self.assertEqual(raised.exception.stage, "read")
+            self.assertFalse((root / "open.html").exists())
+
+    def test_page_error_pickles(self):
+        error = pickle.loads(pickle.dumps(PageError("a.md", "render", 1.5, "ValueError")))
+        self.assertEqual(str(error), "a.md: failed in render after 1.50s: ValueError")
+
+
+class TestGeneratePagesMetadata(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+    def test_front_matter_is_indexed_and_stripped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "content" / "blog" / "tom").mkdir(parents=True)
+            (root / "content" / "index.md").write_text("# Home\n\nHello")
+            (root / "content" / "blog" / "tom" / "index.md").write_text(
+                "---\ntitle: Tom\ndate: 2024-01-02\ntags: [tolkien]\n---\n\nBody text")
+            (root / "template.html").write_text(
+                "<title>{{ Title }}</title>{{ Content }}")
+            index = MetadataIndex()
+            pages = generate_pages(root / "content", root / "template.html",
+                                   root / "docs", index)
+            html = (root / "docs" / "blog" / "tom" / "index.html").read_text()
+
+        self.assertEqual(sorted(page.path for page in pages),
+                         ["/", "/blog/tom/"])
+        tom = index.get("/blog/tom/")
+        self.assertEqual(tom.title, "Tom")
+        self.assertEqual(tom.date, "2024-01-02")
+        self.assertEqual(tom.tags, ["tolkien"])
+        self.assertEqual(index.get("/").title, "Home")
+        self.assertEqual(html, "<title>Tom</title><div><p>Body text</p></div>")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 import unittest
 
-from src.markdown_parser import extract_markdown_images, extract_markdown_links, markdown_to_blocks, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from markdown_parser import extract_markdown_images, extract_markdown_links, has_inline_markup, iter_split_nodes_delimiter, iter_text_to_textnodes, markdown_to_blocks, split_front_matter, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
 from textnode import TextNode, TextType
 
 
@@ -702,6 +702,39 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertListEqual(expected, text_nodes)
 
 
+class TestInlineFastPath(unittest.TestCase):
+    def test_has_inline_markup(self):
+        self.assertFalse(has_inline_markup("Plain text! With 2 * 3 = 6."))
+        for text in ("a **b**", "_i_", "`c`", "[l](/)", "![i](/a.png)"):
+            self.assertTrue(has_inline_markup(text), text)
+
+    def test_plain_text_is_one_node(self):
+        self.assertEqual(text_to_textnodes("Just words, 2 * 3!"),
+                         [TextNode("Just words, 2 * 3!", TextType.TEXT)])
+
+    def test_empty_text(self):
+        self.assertEqual(text_to_textnodes(""), [])
+
+
+class TestIterStages(unittest.TestCase):
+    def test_stages_pull_nodes_lazily(self):
+        pulled = []
+
+        def source():
+            for text in ("a **b**", "c **d**"):
+                pulled.append(text)
+                yield TextNode(text, TextType.TEXT)
+
+        nodes = iter_split_nodes_delimiter(source(), "**", TextType.BOLD)
+        self.assertEqual(pulled, [])
+        self.assertEqual(next(nodes), TextNode("a ", TextType.TEXT))
+        self.assertEqual(pulled, ["a **b**"])
+
+    def test_iter_matches_list(self):
+        text = "**b** _i_ `c` ![img](/a.png) [link](/b) and more"
+        self.assertEqual(list(iter_text_to_textnodes(text)), text_to_textnodes(text))
+
+
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks_basic(self):
         md = """
@@ -723,6 +756,66 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_list_continues_past_blank_lines(self):
+        md = "1. First\n\n   more about first\n\n2. Second\n\nAfter the list"
+        self.assertEqual(markdown_to_blocks(md), [
+            "1. First\n\n   more about first\n\n2. Second",
+            "After the list",
+        ])
+
+    def test_code_fence_keeps_blank_lines(self):
+        md = "Intro\n\n```python\ndef f():\n\n\n    return 1\n```\n\nAfter"
+        self.assertEqual(markdown_to_blocks(md), [
+            "Intro",
+            "```python\ndef f():\n\n\n    return 1\n```",
+            "After",
+        ])
+
+    def test_unclosed_code_fence_runs_to_end(self):
+        md = "```\na\n\nb"
+        self.assertEqual(markdown_to_blocks(md), ["```\na\n\nb"])
+
+    def test_list_of_other_kind_starts_new_block(self):
+        md = "- a\n\n1. b"
+        self.assertEqual(markdown_to_blocks(md), ["- a", "1. b"])
+
+    def test_marker_change_splits_a_list(self):
+        md = "- a\n  1. nested\n1. b\n\n2. c\n\n- d"
+        self.assertEqual(markdown_to_blocks(md), ["- a\n  1. nested", "1. b\n\n2. c", "- d"])
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        markdown = "# Title\n\nBody"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_scalars_and_lists(self):
+        markdown = """---
+title: "Why Tom Bombadil Was a Mistake"
+date: 2024-05-01
+tags: [tolkien, opinion]
+authors:
+  - Archmage
+  - Bilbo
+---
+# Title"""
+        meta, body = split_front_matter(markdown)
+        self.assertEqual(meta, {
+            "title": "Why Tom Bombadil Was a Mistake",
+            "date": "2024-05-01",
+            "tags": ["tolkien", "opinion"],
+            "authors": ["Archmage", "Bilbo"],
+        })
+        self.assertEqual(body, "# Title")
+
+    def test_unclosed_front_matter_is_body(self):
+        markdown = "---\ntitle: x\n# Title"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_invalid_line_raises(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n")
+
 
 if __name__ == "__main__":
     unittest.main()
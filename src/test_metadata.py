@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metadata import MetadataIndex, PageMeta, content_hash
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MetadataIndex([
+            PageMeta("/blog/tom/", "Tom", "2024-01-02", ["tolkien"], "a"),
+            PageMeta("/blog/majesty/", "Majesty", "2024-03-01",
+                     ["tolkien", "review"], "b"),
+            PageMeta("/contact/", "Contact", None, [], "c"),
+        ])
+
+    def test_by_date_newest_first_undated_last(self):
+        paths = [page.path for page in self.index.by_date()]
+        self.assertEqual(paths, ["/blog/majesty/", "/blog/tom/", "/contact/"])
+
+    def test_by_tag(self):
+        self.assertEqual([page.path for page in self.index.by_tag("review")],
+                         ["/blog/majesty/"])
+        self.assertEqual(self.index.tags(), {"tolkien": 2, "review": 1})
+
+    def test_update_only_flags_real_changes(self):
+        self.assertFalse(self.index.update(
+            PageMeta("/blog/tom/", "Tom", "2024-01-02", ["tolkien"], "a")))
+        self.assertFalse(self.index.changed)
+        self.assertTrue(self.index.update(
+            PageMeta("/blog/tom/", "Tom", "2024-01-02", ["tolkien"], "z")))
+        self.assertTrue(self.index.changed)
+        self.assertEqual(self.index.get("/blog/tom/").hash, "z")
+
+    def test_retain_drops_removed_pages(self):
+        self.index.retain(["/contact/"])
+        self.assertEqual(len(self.index), 1)
+        self.assertTrue(self.index.changed)
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cache" / "metadata.json"
+            self.index.save(path)
+            loaded = MetadataIndex.load(path)
+        self.assertEqual(loaded.get("/blog/tom/"), self.index.get("/blog/tom/"))
+        self.assertEqual(len(loaded), 3)
+        self.assertFalse(loaded.changed)
+
+    def test_load_missing_or_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metadata.json"
+            self.assertEqual(len(MetadataIndex.load(path)), 0)
+            path.write_text("{not json")
+            self.assertEqual(len(MetadataIndex.load(path)), 0)
+
+    def test_content_hash_is_stable(self):
+        self.assertEqual(content_hash("abc"), content_hash("abc"))
+        self.assertNotEqual(content_hash("abc"), content_hash("abd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from outputs import copy_if_changed, prune, write_chunks_if_changed, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def test_writes_new_and_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a" / "page.html"
+            self.assertTrue(write_if_changed(path, "<p>one</p>"))
+            self.assertTrue(write_if_changed(path, "<p>two</p>"))
+            self.assertEqual(path.read_text(), "<p>two</p>")
+            self.assertEqual(os.listdir(path.parent), ["page.html"])
+
+    def test_unchanged_file_keeps_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page.html"
+            write_if_changed(path, "<p>same</p>")
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(write_if_changed(path, "<p>same</p>"))
+            self.assertEqual(path.stat().st_mtime_ns, 0)
+
+    def test_write_chunks_if_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a" / "page.html"
+            self.assertTrue(write_chunks_if_changed(path, iter(["<p>", "one", "</p>"])))
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(write_chunks_if_changed(path, ["<p>on", "e</p>"]))
+            self.assertEqual(path.stat().st_mtime_ns, 0)
+            self.assertTrue(write_chunks_if_changed(path, ["<p>one"]))
+            self.assertEqual(path.read_text(), "<p>one")
+            self.assertTrue(write_chunks_if_changed(path, ["<p>one", "</p>!"]))
+            self.assertEqual(path.read_text(), "<p>one</p>!")
+            self.assertEqual(os.listdir(path.parent), ["page.html"])
+
+    def test_write_chunks_failure_keeps_old_file(self):
+        def chunks():
+            yield "<p>new"
+            raise ValueError("Children are missing")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page.html"
+            write_if_changed(path, "<p>old</p>")
+            with self.assertRaises(ValueError):
+                write_chunks_if_changed(path, chunks())
+            self.assertEqual(path.read_text(), "<p>old</p>")
+            self.assertEqual(os.listdir(tmp), ["page.html"])
+
+    def test_copy_if_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "tom.png"
+            src.write_bytes(b"png")
+            dest = Path(tmp) / "out" / "tom.png"
+            self.assertTrue(copy_if_changed(src, dest))
+            self.assertFalse(copy_if_changed(src, dest))
+            self.assertEqual(dest.read_bytes(), b"png")
+
+
+class TestPrune(unittest.TestCase):
+    def test_removes_stale_files_and_empty_dirs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("index.html", "old/index.html", "search/ab.json", "atom.xml"):
+                (root / name).parent.mkdir(parents=True, exist_ok=True)
+                (root / name).write_text("x")
+            removed = prune(root, {"index.html"}, ("search/*",))
+            self.assertEqual(sorted(removed), ["atom.xml", "old/index.html"])
+            self.assertFalse((root / "old").exists())
+            self.assertTrue((root / "search" / "ab.json").is_file())
+
+    def test_missing_dir(self):
+        self.assertEqual(prune("/nonexistent/docs", set()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
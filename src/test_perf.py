@@ -0,0 +1,76 @@
+import json
+import os
+import unittest
+from pathlib import Path
+
+from benchmark import relative_throughput
+
+# The gate runs with the rest of the suite (test.sh); PERF_GATE=0 skips it
+# and PERF_GATE=update records a new baseline. Throughput is measured
+# against a reference workload timed in the same run, so the committed
+# baseline holds on any machine.
+PERF_GATE = os.environ.get("PERF_GATE", "1")
+BASELINE_PATH = Path(os.environ.get(
+    "PERF_BASELINE", Path(__file__).resolve().parent / "perf_baseline.json"))
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", "0.20"))
+
+
+def load_baseline(path):
+    p = Path(path)
+    if not p.is_file():
+        return {}
+    return json.loads(p.read_text())
+
+
+def save_baseline(path, baseline):
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(baseline, indent=1))
+
+
+def check_throughput(name, measured, baseline, tolerance):
+    # Returns an error message when measured throughput regressed
+    expected = baseline.get(name)
+    if expected is None:
+        return None
+    drop = 1 - measured / expected
+    if drop > tolerance:
+        return (f"{name} throughput dropped {drop:.1%} ({measured:.3f}x the reference"
+                f" workload, baseline {expected:.3f}x, tolerance {tolerance:.0%})")
+    return None
+
+
+class TestCheckThroughput(unittest.TestCase):
+    def test_within_tolerance(self):
+        self.assertIsNone(check_throughput("render", 85, {"render": 100}, 0.2))
+
+    def test_faster_is_fine(self):
+        self.assertIsNone(check_throughput("render", 150, {"render": 100}, 0.2))
+
+    def test_regression(self):
+        message = check_throughput("render", 70, {"render": 100}, 0.2)
+        self.assertIn("dropped 30.0%", message)
+
+    def test_missing_baseline(self):
+        self.assertIsNone(check_throughput("render", 70, {}, 0.2))
+
+
+@unittest.skipIf(PERF_GATE == "0", "PERF_GATE=0 skips the performance gate")
+class TestPerformanceGate(unittest.TestCase):
+    def test_markdown_to_html_node_throughput(self):
+        name = "markdown_to_html_node corpus"
+        measured = relative_throughput()
+        baseline = load_baseline(BASELINE_PATH)
+        if PERF_GATE == "update":
+            baseline[name] = round(measured, 3)
+            save_baseline(BASELINE_PATH, baseline)
+            return
+        if name not in baseline:
+            self.fail(f"no baseline for {name} in {BASELINE_PATH}, run with PERF_GATE=update")
+        message = check_throughput(name, measured, baseline, TOLERANCE)
+        if message:
+            self.fail(message)
+
+
+if __name__ == "__main__":
+    unittest.main()
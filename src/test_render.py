@@ -0,0 +1,461 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from render import Outline, RenderCache, iter_markdown_html, markdown_outline, markdown_to_html_node, text_node_to_html_node, extract_title
+from urls import UrlResolver
+from textnode import TextNode, TextType
+
+
+def test_text(self):
+    node = TextNode("This is a text node", TextType.TEXT)
+    html_node = text_node_to_html_node(node)
+    self.assertEqual(html_node.tag, None)
+    self.assertEqual(html_node.value, "This is a text node")
+
+
+class TestMarkdownToHTML(unittest.TestCase):
+    def test_basic(self):
+        md = """
+This is just **text**
+Same
+
+Another
+"""
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><p>This is just <b>text</b> Same</p><p>Another</p></div>"
+        )
+
+    def test_paragraphs(self):
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_codeblock(self):
+        md = """
+```
+This is text that _should_ remain
+the **same** even with inline stuff
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_codeblock_with_blank_lines_and_language(self):
+        md = """
+```python
+x = 1
+
+y = 2
+```
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-python">x = <span class="tok-number">1</span>\n\n'
+            'y = <span class="tok-number">2</span>\n</code></pre></div>',
+        )
+
+    def test_codeblock_unknown_language(self):
+        md = "```elflang\nif a < b\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-elflang">if a &lt; b\n</code></pre></div>',
+        )
+
+    def test_quote_block(self):
+        md = """
+> This is a quote
+> Another line
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><blockquote>This is a quote\nAnother line</blockquote></div>",
+        )
+
+    def test_unordered_list_block(self):
+        md = """
+- Item 1
+- Item 2
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><ul><li>Item 1</li><li>Item 2</li></ul></div>",
+        )
+
+    def test_ordered_list_block(self):
+        md = """
+1. First
+2. Second
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><ol><li>First</li><li>Second</li></ol></div>",
+        )
+
+    def test_headings(self):
+        md = """
+# Heading 1
+
+## Heading 2
+
+### Heading 3
+
+#### Heading 4
+
+##### Heading 5
+
+###### Heading 6
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><h1>Heading 1</h1><h2>Heading 2</h2><h3>Heading 3</h3><h4>Heading 4</h4><h5>Heading 5</h5><h6>Heading 6</h6></div>",
+        )
+
+    def test_text_and_code_are_escaped(self):
+        md = """
+[< Back Home](/) & more
+
+```
+if a < b && c > d:
+```
+"""
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/">&lt; Back Home</a> &amp; more</p>'
+            "<pre><code>if a &lt; b &amp;&amp; c &gt; d:\n</code></pre></div>",
+        )
+
+    def test_resolve_url_rewrites_links_not_code(self):
+        md = """
+[home](/) ![tom](/images/tom.png) [rel](blog/tom)
+
+```
+<a href="/">raw</a>
+```
+"""
+        node = markdown_to_html_node(md, resolve_url=UrlResolver("/base"))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/base/">home</a> <img src="/base/images/tom.png" alt="tom"></img>'
+            ' <a href="blog/tom">rel</a></p>'
+            '<pre><code>&lt;a href="/"&gt;raw&lt;/a&gt;\n</code></pre></div>',
+        )
+
+    def test_on_text_nodes_sees_every_inline_run(self):
+        md = """
+# Title with **bold**
+
+- item _one_
+
+```
+code
+```
+"""
+        seen = []
+        markdown_to_html_node(md, seen.extend)
+        self.assertEqual(seen, [
+            TextNode("Title with ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("item ", TextType.TEXT),
+            TextNode("one", TextType.ITALIC),
+            TextNode("code\n", TextType.TEXT),
+        ])
+
+    def test_paragraph_simple(self):
+        md = """
+This is a simple paragraph.
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><p>This is a simple paragraph.</p></div>",
+        )
+
+
+class TestLists(unittest.TestCase):
+    def test_ordered_list_past_nine(self):
+        md = "\n".join(f"{i}. item {i}" for i in range(1, 12))
+        html = markdown_to_html_node(md).to_html()
+        self.assertIn("<li>item 10</li><li>item 11</li></ol>", html)
+
+    def test_ordered_list_start(self):
+        html = markdown_to_html_node("3. three\n4. four").to_html()
+        self.assertEqual(html, '<div><ol start="3"><li>three</li><li>four</li></ol></div>')
+
+    def test_nested_lists(self):
+        md = """
+- a
+- b
+  - b1
+    1. x
+    2. y
+  - b2
+- c
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a</li><li>b<ul><li>b1<ol><li>x</li><li>y</li></ol></li>"
+            "<li>b2</li></ul></li><li>c</li></ul></div>",
+        )
+
+    def test_marker_change_starts_a_new_list(self):
+        self.assertEqual(markdown_to_html_node("- a\n1. b").to_html(),
+                         "<div><ul><li>a</li></ul><ol><li>b</li></ol></div>")
+        self.assertEqual(markdown_to_html_node("- a\n  - x\n  1. y\n- b").to_html(),
+                         "<div><ul><li>a<ul><li>x</li></ul><ol><li>y</li></ol></li>"
+                         "<li>b</li></ul></div>")
+
+    def test_dedent_inside_item_continues_its_list(self):
+        self.assertEqual(markdown_to_html_node("- a\n    - deep\n  - mid").to_html(),
+                         "<div><ul><li>a<ul><li>deep</li><li>mid</li></ul></li></ul></div>")
+
+    def test_multi_paragraph_item(self):
+        md = """
+1. First
+
+   More about **first**
+   on two lines
+
+2. Second
+   - nested
+
+   Back in second
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ol><li><p>First</p><p>More about <b>first</b> on two lines</p></li>"
+            "<li><p>Second</p><ul><li>nested</li></ul><p>Back in second</p></li></ol></div>",
+        )
+
+    def test_lazy_continuation(self):
+        html = markdown_to_html_node("- one\ncontinued\n- two").to_html()
+        self.assertEqual(html, "<div><ul><li>one continued</li><li>two</li></ul></div>")
+
+    def test_deep_nesting(self):
+        md = "\n".join(f"{'  ' * depth}- {depth}" for depth in range(2000))
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html.count("<ul>"), 2000)
+        self.assertTrue(html.endswith("<li>1999</li>" + "</ul></li>" * 1999 + "</ul></div>"))
+
+
+class TestTables(unittest.TestCase):
+    def test_table(self):
+        md = """
+| Name | Age |
+|:-----|----:|
+| **Tom** | 1 |
+| <x> & y |
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><table><thead><tr><th style="text-align: left">Name</th>'
+            '<th style="text-align: right">Age</th></tr></thead><tbody>'
+            '<tr><td style="text-align: left"><b>Tom</b></td><td style="text-align: right">1</td></tr>'
+            '<tr><td style="text-align: left">&lt;x&gt; &amp; y</td><td style="text-align: right"></td></tr>'
+            '</tbody></table></div>',
+        )
+
+    def test_escaped_pipe_and_extra_cells(self):
+        html = markdown_to_html_node("a | b\n-|-\nx \\| y | z | dropped").to_html()
+        self.assertIn("<tr><td>x | y</td><td>z</td></tr>", html)
+
+    def test_header_only(self):
+        html = markdown_to_html_node("a | b\n-|-").to_html()
+        self.assertEqual(html, "<div><table><thead><tr><th>a</th><th>b</th></tr></thead></table></div>")
+
+    def test_plain_cells_reach_hooks(self):
+        seen = []
+        markdown_to_html_node("a | b\n-|-\nplain | [link](/x)", seen.extend)
+        self.assertIn(TextNode("plain", TextType.TEXT), seen)
+        self.assertIn(TextNode("link", TextType.LINK, "/x"), seen)
+
+
+class TestInlineFragments(unittest.TestCase):
+    def test_repeated_inline_text_is_parsed_once(self):
+        seen = []
+        first = markdown_to_html_node("[< Back Home](/)\n\nOne", seen.append)
+        second = markdown_to_html_node("[< Back Home](/)\n\nTwo", seen.append)
+        self.assertIs(seen[0], seen[2])
+        self.assertEqual(seen[0], (TextNode("< Back Home", TextType.LINK, "/"),))
+        self.assertEqual(first.to_html(), '<div><p><a href="/">&lt; Back Home</a></p><p>One</p></div>')
+        self.assertEqual(second.to_html(), '<div><p><a href="/">&lt; Back Home</a></p><p>Two</p></div>')
+
+
+class TestOutline(unittest.TestCase):
+    def test_headings_get_deduplicated_ids(self):
+        outline = Outline()
+        md = "# Title\n\n## Intro\n\n## Intro\n\n### **Bold** & [link](/x)\n\n## Intro-1"
+        html = markdown_to_html_node(md, outline=outline).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="title">Title</h1><h2 id="intro">Intro</h2><h2 id="intro-1">Intro</h2>'
+            '<h3 id="bold--link"><b>Bold</b> &amp; <a href="/x">link</a></h3>'
+            '<h2 id="intro-1-1">Intro-1</h2></div>')
+        self.assertEqual([level for level, _, _ in outline.headings], [1, 2, 2, 3, 2])
+
+    def test_no_outline_leaves_headings_alone(self):
+        self.assertEqual(markdown_to_html_node("## Intro").to_html(), "<div><h2>Intro</h2></div>")
+
+    def test_toc_nests_by_level(self):
+        outline = Outline()
+        markdown_to_html_node("# T\n\n## A\n\n### B\n\n#### C\n\n## D", outline=outline)
+        self.assertEqual(
+            outline.to_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#b">B</a>'
+            '<ul><li><a href="#c">C</a></li></ul></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul></nav>')
+        self.assertEqual(Outline().to_html(), "")
+
+    def test_toc_with_skipped_levels(self):
+        outline = Outline()
+        markdown_to_html_node("## A\n\n#### B\n\n### C\n\n## D", outline=outline)
+        self.assertEqual(
+            outline.to_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li>'
+            '<li><a href="#c">C</a></li></ul></li><li><a href="#d">D</a></li></ul></nav>')
+
+    def test_outline_hooks_and_cache(self):
+        md = "# Title\n\n## See [home](/)\n\ntext\n\n## See [home](/)"
+        seen = []
+        cache = RenderCache()
+        outlines = [Outline(), Outline()]
+        for outline in outlines:
+            html = markdown_to_html_node(md, seen.extend, cache=cache, outline=outline).to_html()
+            self.assertIn('<h2 id="see-home-1">', html)
+        self.assertEqual(seen.count(TextNode("home", TextType.LINK, "/")), 4)
+        self.assertEqual(outlines[0].headings, outlines[1].headings)
+        self.assertEqual(markdown_outline(md).headings, outlines[0].headings)
+
+
+class TestChunkedRender(unittest.TestCase):
+    def test_sections_join_to_the_whole_page(self):
+        md = ("# Title\n\nIntro **bold**\n\n## One\n\n- a\n- b\n\n"
+              "```\ncode\n\nmore\n```\n\n## Two\n\n> quote\n\n### Three\n\ntext")
+        chunks = list(iter_markdown_html(md))
+        self.assertEqual("".join(chunks), markdown_to_html_node(md).to_html())
+        self.assertEqual(len(chunks), 5)
+
+    def test_sections_replay_hooks(self):
+        seen = []
+        "".join(iter_markdown_html("# A\n\n[x](/x)\n\n## B\n\nplain", seen.extend))
+        self.assertIn(TextNode("x", TextType.LINK, "/x"), seen)
+        self.assertIn(TextNode("plain", TextType.TEXT), seen)
+
+    def test_empty_page_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_markdown_html(""))
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_cached_blocks_render_the_same_and_replay_hooks(self):
+        md = "# Title\n\nSee [home](/) and **more**\n\n- a\n- b"
+        resolve_url = UrlResolver("/base")
+        cache = RenderCache(resolve_url)
+        expected = markdown_to_html_node(md, resolve_url=resolve_url).to_html()
+        for _ in range(2):
+            seen = []
+            html = markdown_to_html_node(md, seen.extend, cache=cache).to_html()
+            self.assertEqual(html, expected)
+            self.assertIn(TextNode("home", TextType.LINK, "/"), seen)
+        self.assertEqual(len(cache.blocks), 3)
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title_basic(self):
+        markdown = "# Title"
+        self.assertEqual(extract_title(markdown), "Title")
+
+    def test_extract_title_with_spaces(self):
+        markdown = "# Title with spaces  "
+        self.assertEqual(extract_title(markdown), "Title with spaces")
+
+    def test_extract_title_with_inline_formatting(self):
+        markdown = "# Title with **bold**"
+        self.assertEqual(extract_title(markdown), "Title with **bold**")
+
+    def test_extract_title_with_multiple_paragraphs(self):
+        markdown = "# Title\n\nParagraph"
+        self.assertEqual(extract_title(markdown), "Title")
+
+    def test_extract_title_with_newline_in_block(self):
+        markdown = "# Title\ncontinuation"
+        self.assertEqual(extract_title(markdown), "Title\ncontinuation")
+
+    def test_extract_title_empty_title(self):
+        markdown = "# "
+        self.assertEqual(extract_title(markdown), "")
+
+    def test_extract_title_invalid_no_hash(self):
+        with self.assertRaises(Exception):
+            extract_title("Paragraph")
+
+    def test_extract_title_invalid_wrong_heading_level(self):
+        with self.assertRaises(Exception):
+            extract_title("## Title")
+
+    def test_extract_title_invalid_no_space_after_hash(self):
+        with self.assertRaises(Exception):
+            extract_title("#Title")
+
+    def test_extract_title_invalid_empty_markdown(self):
+        with self.assertRaises(Exception):
+            extract_title("")
+
+    def test_extract_title_invalid_leading_empty_block(self):
+        with self.assertRaises(Exception):
+            extract_title("\n\n# Title")
+
+    def test_extract_title_invalid_multiple_hashes(self):
+        with self.assertRaises(Exception):
+            extract_title("### Title")
+
+
+class TestImportSideEffects(unittest.TestCase):
+    def test_render_import_is_light(self):
+        code = ("import sys, render; print(sorted(name for name in "
+                "('build', 'main', 'feeds', 'json', 'argparse', 'hashlib', 'shutil', "
+                "'concurrent.futures') if name in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code],
+                                cwd=Path(__file__).resolve().parent,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+        self.assertEqual(result.stderr, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
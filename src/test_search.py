@@ -0,0 +1,94 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from search import SearchIndex, count_terms, term_prefix, tokenize
+from textnode import TextNode, TextType
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize_drops_stop_words_and_short_tokens(self):
+        self.assertEqual(tokenize("The Hobbit, and a Ring of Power!"),
+                         ["hobbit", "ring", "power"])
+
+    def test_count_terms_uses_text_node_stream(self):
+        nodes = [
+            TextNode("Glorfindel rides ", TextType.TEXT),
+            TextNode("Glorfindel", TextType.BOLD),
+            TextNode("home", TextType.LINK, "/"),
+        ]
+        self.assertEqual(count_terms(nodes, {}),
+                         {"glorfindel": 2, "rides": 1, "home": 1})
+
+    def test_term_prefix_pads_short_terms(self):
+        self.assertEqual(term_prefix("ring"), "ri")
+        self.assertEqual(term_prefix("x"), "x_")
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_search_and_retain(self):
+        index = SearchIndex()
+        index.update("/a/", "A", {"ring": 2, "elf": 1})
+        index.update("/b/", "B", {"ring": 1})
+        self.assertEqual(index.search("ring"), ["/a/", "/b/"])
+        self.assertEqual(index.search("ring elf"), ["/a/"])
+        index.retain(["/b/"])
+        self.assertEqual(index.search("elf"), [])
+
+    def test_terms_are_shared_between_pages(self):
+        index = SearchIndex()
+        index.update("/a/", "A", {"".join(["ri", "ng"]): 1})
+        index.update("/b/", "B", {"".join(["rin", "g"]): 2})
+        a_term, = index.docs["/a/"]["terms"]
+        b_term, = index.docs["/b/"]["terms"]
+        self.assertIs(a_term, b_term)
+        self.assertEqual(index.terms.refs("ring"), 2)
+        index.update("/b/", "B", {"elf": 1})
+        index.retain(["/b/"])
+        self.assertNotIn("ring", index.terms)
+        self.assertEqual(index.terms.refs("elf"), 1)
+
+    def test_write_shards_by_prefix(self):
+        index = SearchIndex()
+        index.update("/a/", "A", {"ring": 2, "rivendell": 1, "elf": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            index.write(tmp)
+            search_dir = Path(tmp) / "search"
+            names = sorted(p.name for p in search_dir.iterdir())
+            shard = json.loads((search_dir / "ri.json").read_text())
+            docs = json.loads((search_dir / "docs.json").read_text())
+        self.assertEqual(names, ["docs.json", "el.json", "ri.json"])
+        self.assertEqual(shard, {"ring": [[0, 2]], "rivendell": [[0, 1]]})
+        self.assertEqual(docs, {"0": ["/a/", "A"]})
+
+    def test_incremental_update_rewrites_only_touched_shards(self):
+        index = SearchIndex()
+        index.update("/a/", "A", {"ring": 1, "elf": 1})
+        index.update("/b/", "B", {"orc": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            index.write(tmp)
+            self.assertFalse(index.update("/b/", "B", {"orc": 1}))
+            self.assertEqual(index.write(tmp), 0)
+            index.update("/a/", "A", {"ring": 1})
+            self.assertEqual(index.write(tmp), 2)
+            names = sorted(p.name for p in (Path(tmp) / "search").iterdir())
+        self.assertEqual(names, ["docs.json", "or.json", "ri.json"])
+
+    def test_save_and_load_keeps_ids_stable(self):
+        index = SearchIndex()
+        index.update("/a/", "A", {"ring": 1})
+        index.update("/b/", "B", {"elf": 1})
+        index.retain(["/b/"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "search.json"
+            index.save(path)
+            loaded = SearchIndex.load(path)
+        loaded.update("/c/", "C", {"orc": 1})
+        self.assertEqual(loaded.docs["/b/"]["id"], 1)
+        self.assertEqual(loaded.docs["/c/"]["id"], 0)
+        self.assertEqual(loaded.search("elf"), ["/b/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
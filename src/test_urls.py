@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from urls import UrlResolver, asset_manifest, resolve_template_urls, split_url
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_basepath_prefixes_root_relative_urls(self):
+        resolve = UrlResolver("/static-site-gen-python/")
+        self.assertEqual(resolve("/blog/tom"), "/static-site-gen-python/blog/tom")
+        self.assertEqual(resolve("/"), "/static-site-gen-python/")
+
+    def test_relative_and_external_urls_untouched(self):
+        resolve = UrlResolver("/base")
+        for url in ("blog/tom", "../x.png", "https://boot.dev", "//cdn.example.com/a.js", "#top", ""):
+            with self.subTest(url=url):
+                self.assertEqual(resolve(url), url)
+
+    def test_asset_manifest_keeps_query_and_fragment(self):
+        resolve = UrlResolver("/base", {"/index.css": "/index.0123abcd.css"})
+        self.assertEqual(resolve("/index.css?v=2#x"), "/base/index.0123abcd.css?v=2#x")
+        self.assertEqual(split_url("/a?b#c"), ("/a", "?b#c"))
+
+    def test_resolve_template_urls(self):
+        template = '<link href="/index.css" rel="stylesheet" /><img src="/a.png">'
+        self.assertEqual(resolve_template_urls(template, UrlResolver("/base")),
+                         '<link href="/base/index.css" rel="stylesheet" /><img src="/base/a.png">')
+
+    def test_hashed_assets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = Path(tmp) / "static"
+            (static / "images").mkdir(parents=True)
+            (static / "images" / "tom.png").write_bytes(b"tom")
+            manifest = asset_manifest(static)
+        self.assertRegex(manifest["/images/tom.png"], r"^/images/tom\.[0-9a-f]{8}\.png$")
+
+
+if __name__ == "__main__":
+    unittest.main()
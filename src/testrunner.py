@@ -0,0 +1,84 @@
+import io
+import sys
+import time
+import unittest
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+# Timing tests would measure the other shards as much as the code, so
+# they run on their own once the pool is done
+SERIAL_MODULES = ("test_perf",)
+
+
+class ModuleResult:
+    def __init__(self, name, run, failures, errors, skipped, output, seconds):
+        self.name = name
+        self.run = run
+        self.failures = failures
+        self.errors = errors
+        self.skipped = skipped
+        self.output = output
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return not self.failures and not self.errors
+
+
+def discover_modules(test_dir=TEST_DIR, pattern="test_*.py"):
+    return [path.stem for path in sorted(Path(test_dir).glob(pattern))]
+
+
+def run_module(name):
+    stream = io.StringIO()
+    start = time.perf_counter()
+    suite = unittest.defaultTestLoader.loadTestsFromName(name)
+    result = unittest.TextTestRunner(stream=stream, verbosity=0, buffer=True).run(suite)
+    return ModuleResult(name, result.testsRun, len(result.failures), len(result.errors),
+                        len(result.skipped), stream.getvalue(),
+                        time.perf_counter() - start)
+
+
+def run_modules(names, jobs=1):
+    parallel = [name for name in names if name not in SERIAL_MODULES]
+    serial = [name for name in names if name in SERIAL_MODULES]
+    if jobs <= 1 or len(parallel) <= 1:
+        results = [run_module(name) for name in parallel]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(run_module, parallel))
+    return results + [run_module(name) for name in serial]
+
+
+def parse_args(argv=None):
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="Run the test modules in parallel.")
+    parser.add_argument("modules", nargs="*",
+                        help="test modules to run, all test_*.py by default")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    results = run_modules(args.modules or discover_modules(), args.jobs)
+    for result in results:
+        if not result.ok:
+            print(result.output, end="")
+        status = "ok" if result.ok else "FAILED"
+        print(f"{result.name:<30} {result.run:4} tests {result.seconds:7.2f}s {status}")
+    run = sum(result.run for result in results)
+    failures = sum(result.failures for result in results)
+    errors = sum(result.errors for result in results)
+    skipped = sum(result.skipped for result in results)
+    print(f"Ran {run} tests in {time.perf_counter() - start:.2f}s with {args.jobs} jobs"
+          f" ({failures} failures, {errors} errors, {skipped} skipped)")
+    return 0 if not failures and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
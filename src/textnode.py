@@ -8,6 +8,7 @@ class TextType(Enum):
     CODE = "code_text"
     LINK = "link_text"
     IMAGE = "image_alt_text"
+    EXTENSION = "extension"
 
 
 class TextNode:
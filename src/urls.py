@@ -0,0 +1,50 @@
+import re
+from pathlib import Path
+
+TEMPLATE_URL_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def split_url(url):
+    for index, char in enumerate(url):
+        if char in "?#":
+            return url[:index], url[index:]
+    return url, ""
+
+
+class UrlResolver:
+    def __init__(self, basepath="", assets=None):
+        self.basepath = basepath.rstrip("/")
+        self.assets = assets if assets is not None else {}
+
+    def __call__(self, url):
+        # Only root-relative urls are ours; relative and external links
+        # pass through untouched
+        if not url or not url.startswith("/") or url.startswith("//"):
+            return url
+        path, rest = split_url(url)
+        path = self.assets.get(path, path)
+        return f"{self.basepath}{path}{rest}"
+
+
+def resolve_template_urls(template, resolve_url):
+    return TEMPLATE_URL_PATTERN.sub(
+        lambda match: f'{match[1]}="{resolve_url(match[2])}"', template)
+
+
+def hashed_name(path, data):
+    import hashlib
+    digest = hashlib.sha256(data).hexdigest()[:8]
+    p = Path(path)
+    return p.with_name(f"{p.stem}.{digest}{p.suffix}")
+
+
+def asset_manifest(static_dir):
+    root = Path(static_dir)
+    manifest = {}
+    for item in sorted(root.rglob("*")):
+        if item.is_file():
+            relative = item.relative_to(root)
+            hashed = hashed_name(relative, item.read_bytes())
+            manifest["/" + relative.as_posix()] = "/" + hashed.as_posix()
+    return manifest
+